@@ -18,6 +18,8 @@ SEARCH_QUERIES = [
 # Rate limiting
 REQUESTS_PER_MINUTE = 30  # GitHub API rate limit for authenticated requests
 REQUEST_DELAY = 2.0  # Seconds between requests
+SKILLSMP_REQUESTS_PER_MINUTE = 40  # SkillsMP rate limit is strict
+SKILLSMP_MAX_WORKERS = 4  # Concurrent SkillsMP page fetches
 
 # Quality filters
 MIN_STARS = 0  # Minimum stars to include (0 = include all)
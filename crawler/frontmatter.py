@@ -0,0 +1,38 @@
+"""
+Fast path for SKILL.md frontmatter
+Flat `key: plain text` blocks are parsed without PyYAML, with the same result
+"""
+
+import re
+import yaml
+from typing import Optional
+
+# Frontmatter lines simple enough to parse without YAML: `key: plain text`
+_FLAT_LINE_RE = re.compile(r'^([A-Za-z_][\w-]*): +([^\s\'"\[\]{}|>&*!%@`#,?:-].*)$')
+_YAML_STR_TAG = 'tag:yaml.org,2002:str'
+_RESOLVER = yaml.resolver.Resolver()
+
+
+def parse_flat_frontmatter(block: str) -> Optional[dict]:
+    """Parse a flat map of plain-string scalars; None if YAML is needed"""
+    data = {}
+    for line in block.splitlines():
+        if not line.strip():
+            continue
+        match = _FLAT_LINE_RE.match(line)
+        if not match or '\t' in line:
+            return None
+        value = match.group(2).rstrip()
+        # Comments, nested mappings and non-string scalars (ints, bools,
+        # dates, ...) keep full YAML semantics
+        if ': ' in value or ' #' in value or value.endswith(':'):
+            return None
+        key = match.group(1)
+        # Keys resolve like values: `true:`, `on:` or `null:` aren't strings
+        if (
+            _RESOLVER.resolve(yaml.ScalarNode, key, (True, False)) != _YAML_STR_TAG
+            or _RESOLVER.resolve(yaml.ScalarNode, value, (True, False)) != _YAML_STR_TAG
+        ):
+            return None
+        data[key] = value
+    return data or None
@@ -7,6 +7,35 @@ import re
 import yaml
 from typing import Optional
 from .config import CATEGORY_KEYWORDS
+from .frontmatter import parse_flat_frontmatter
+
+# libyaml-backed loader when PyYAML is built with it (5-10x faster)
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+# Compiled once at import; these run for every SKILL.md
+_FRONTMATTER_RE = re.compile(r'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)
+_TITLE_RE = re.compile(r'^#\s+(.+)$', re.MULTILINE)
+_NAME_SPLIT_RE = re.compile(r'[-_]')
+
+# Only this much of the body is searched for the description paragraph
+DESCRIPTION_SCAN_CHARS = 4096
+
+# Keyword tables built once at import instead of per call
+_CATEGORY_TABLE = tuple((category, tuple(keywords)) for category, keywords in CATEGORY_KEYWORDS.items())
+_WORD_RE = re.compile(r'[a-z0-9]+')  # Tokens matched against _COMMON_TAGS
+_COMMON_TAGS = frozenset((
+    'react', 'vue', 'svelte', 'angular', 'nextjs', 'typescript', 'javascript',
+    'python', 'rust', 'go', 'java', 'kotlin', 'swift', 'ruby', 'php',
+    'docker', 'kubernetes', 'aws', 'gcp', 'azure', 'terraform',
+    'postgresql', 'mongodb', 'redis', 'mysql', 'sqlite',
+    'git', 'github', 'gitlab', 'ci', 'cd', 'devops',
+    'testing', 'tdd', 'jest', 'pytest', 'playwright', 'cypress',
+    'api', 'rest', 'graphql', 'grpc', 'websocket',
+    'mcp', 'claude', 'ai', 'llm', 'agent', 'automation',
+))
 
 
 class SkillParser:
@@ -18,10 +47,15 @@ class SkillParser:
         frontmatter = {}
 
         # Match YAML frontmatter between ---
-        match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
+        match = _FRONTMATTER_RE.match(content)
         if match:
+            block = match.group(1)
+            # Flat `key: value` blocks skip PyYAML entirely
+            flat = parse_flat_frontmatter(block)
+            if flat is not None:
+                return flat
             try:
-                frontmatter = yaml.safe_load(match.group(1)) or {}
+                frontmatter = yaml.load(block, Loader=_SafeLoader) or {}
             except yaml.YAMLError:
                 pass
 
@@ -30,7 +64,7 @@ class SkillParser:
     @staticmethod
     def extract_title(content: str) -> Optional[str]:
         """Extract title from first # heading"""
-        match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
+        match = _TITLE_RE.search(content)
         if match:
             return match.group(1).strip()
         return None
@@ -38,12 +72,14 @@ class SkillParser:
     @staticmethod
     def extract_description(content: str) -> Optional[str]:
         """Extract description from content"""
-        # Remove frontmatter
-        content = re.sub(r'^---\s*\n.*?\n---\s*\n', '', content, flags=re.DOTALL)
+        # Skip frontmatter; the description sits near the top of the body
+        match = _FRONTMATTER_RE.match(content)
+        start = match.end() if match else 0
+        lines = content[start:start + DESCRIPTION_SCAN_CHARS].strip().splitlines()
 
         # Try to find first paragraph after title
-        lines = content.strip().split('\n')
         description_lines = []
+        joined_len = -1  # len(' '.join(description_lines))
 
         found_title = False
         for line in lines:
@@ -51,11 +87,12 @@ class SkillParser:
             if line.startswith('#'):
                 found_title = True
                 continue
-            if found_title and line and not line.startswith('#'):
+            if found_title and line:
                 description_lines.append(line)
-                if len(' '.join(description_lines)) > 100:
+                joined_len += len(line) + 1
+                if joined_len > 100:
                     break
-            elif found_title and not line and description_lines:
+            elif found_title and description_lines:
                 break
 
         if description_lines:
@@ -73,25 +110,11 @@ class SkillParser:
         tags = set()
 
         # Add tags from name
-        name_parts = re.split(r'[-_]', name.lower())
+        name_parts = _NAME_SPLIT_RE.split(name.lower())
         tags.update(name_parts)
 
-        # Find common keywords in content
-        content_lower = content.lower()
-        common_tags = [
-            'react', 'vue', 'svelte', 'angular', 'nextjs', 'typescript', 'javascript',
-            'python', 'rust', 'go', 'java', 'kotlin', 'swift', 'ruby', 'php',
-            'docker', 'kubernetes', 'aws', 'gcp', 'azure', 'terraform',
-            'postgresql', 'mongodb', 'redis', 'mysql', 'sqlite',
-            'git', 'github', 'gitlab', 'ci', 'cd', 'devops',
-            'testing', 'tdd', 'jest', 'pytest', 'playwright', 'cypress',
-            'api', 'rest', 'graphql', 'grpc', 'websocket',
-            'mcp', 'claude', 'ai', 'llm', 'agent', 'automation',
-        ]
-
-        for tag in common_tags:
-            if tag in content_lower:
-                tags.add(tag)
+        # Find common keywords in content (whole words, one pass over the text)
+        tags.update(_COMMON_TAGS.intersection(_WORD_RE.findall(content.lower())))
 
         return list(tags)[:10]  # Limit to 10 tags
 
@@ -101,9 +124,10 @@ class SkillParser:
         text = f"{name} {description} {' '.join(tags)}".lower()
 
         # Score each category
+        contains = text.__contains__
         scores = {}
-        for category, keywords in CATEGORY_KEYWORDS.items():
-            score = sum(1 for kw in keywords if kw in text)
+        for category, keywords in _CATEGORY_TABLE:
+            score = sum(map(contains, keywords))
             if score > 0:
                 scores[category] = score
 
@@ -6,16 +6,29 @@ Sync skills from SkillsMP.com API which has already crawled 32,000+ skills
 import json
 import time
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional
 from datetime import datetime
+from operator import itemgetter
 
-from .config import CATEGORY_KEYWORDS
+from .config import SKILLSMP_REQUESTS_PER_MINUTE, SKILLSMP_MAX_WORKERS
+from .skill_parser import SkillParser
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json produces identical output
+    orjson = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 SKILLSMP_API = "https://skillsmp.com/api/skills"
+POOL_SIZE = 32  # Keep-alive connections per host
 
 
 class SkillsMPSync:
@@ -24,13 +37,40 @@ class SkillsMPSync:
     def __init__(self):
         self.session = requests.Session()
         self.session.headers['User-Agent'] = 'Claude-Skills-Registry/1.0'
+        # Pooled keep-alive connections; 429 backoff is handled in _request
+        adapter = HTTPAdapter(
+            pool_connections=POOL_SIZE,
+            pool_maxsize=POOL_SIZE,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=1.0,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(['GET']),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         # Enable SSL verification for security
         self.session.verify = True
         self.skills = []
+        # Token bucket shared by page-fetch threads
+        self._rate_lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def _throttle(self):
+        """Wait for the next request slot so all threads share SKILLSMP_REQUESTS_PER_MINUTE"""
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next_slot - now)
+            self._next_slot = max(now, self._next_slot) + 60.0 / SKILLSMP_REQUESTS_PER_MINUTE
+        if wait:
+            time.sleep(wait)
 
     def _request(self, page: int = 1, limit: int = 100, retries: int = 3) -> Optional[dict]:
         """Make request to SkillsMP API with retry logic"""
         for attempt in range(retries):
+            self._throttle()
             try:
                 params = {
                     'page': page,
@@ -57,19 +97,7 @@ class SkillsMPSync:
 
     def _detect_category(self, skill: dict) -> str:
         """Detect category from skill data"""
-        name = skill.get('name', '').lower()
-        description = skill.get('description', '').lower()
-        text = f"{name} {description}"
-
-        scores = {}
-        for category, keywords in CATEGORY_KEYWORDS.items():
-            score = sum(1 for kw in keywords if kw in text)
-            if score > 0:
-                scores[category] = score
-
-        if scores:
-            return max(scores, key=scores.get)
-        return "development"
+        return SkillParser.detect_category(skill.get('name', ''), skill.get('description', ''), [])
 
     def _transform_skill(self, skill: dict) -> dict:
         """Transform SkillsMP skill to our format"""
@@ -107,54 +135,71 @@ class SkillsMPSync:
             'featured': skill.get('stars', 0) >= 50,
         }
 
-    def sync(self, max_skills: int = 50000, min_stars: int = 0) -> list:
-        """Sync skills from SkillsMP"""
-        logger.info("Starting SkillsMP sync...")
-
-        page = 1
-        total_pages = 1
+    def _add_page(self, result: dict, max_skills: int, min_stars: int):
+        """Transform and collect the skills of one API page"""
+        for skill in result.get('skills', []):
+            # Filter by stars
+            if skill.get('stars', 0) < min_stars:
+                continue
 
-        while page <= total_pages and len(self.skills) < max_skills:
-            logger.info(f"Fetching page {page}/{total_pages}...")
+            transformed = self._transform_skill(skill)
+            if transformed['repo']:  # Only add if we have a valid repo
+                self.skills.append(transformed)
 
-            result = self._request(page=page, limit=100)
-            if not result:
+            if len(self.skills) >= max_skills:
                 break
 
+    def sync(self, max_skills: int = 50000, min_stars: int = 0) -> list:
+        """Sync skills from SkillsMP"""
+        logger.info("Starting SkillsMP sync...")
+
+        logger.info("Fetching page 1...")
+        result = self._request(page=1, limit=100)
+        if result:
             pagination = result.get('pagination', {})
             total_pages = pagination.get('totalPages', 1)
             total_count = pagination.get('total', 0)
 
             logger.info(f"Total available: {total_count} skills")
-
-            for skill in result.get('skills', []):
-                # Filter by stars
-                if skill.get('stars', 0) < min_stars:
-                    continue
-
-                transformed = self._transform_skill(skill)
-                if transformed['repo']:  # Only add if we have a valid repo
-                    self.skills.append(transformed)
-
-                if len(self.skills) >= max_skills:
-                    break
-
-            page += 1
-            time.sleep(1.5)  # Be nice to their API - rate limit is strict
+            self._add_page(result, max_skills, min_stars)
+
+            # Remaining pages are fetched concurrently but consumed in page
+            # order, keeping a small window in flight so an early stop
+            # (max_skills reached, failed page) wastes few requests
+            with ThreadPoolExecutor(max_workers=SKILLSMP_MAX_WORKERS) as executor:
+                pending = deque()
+                next_page = 2
+                while len(self.skills) < max_skills:
+                    while next_page <= total_pages and len(pending) < SKILLSMP_MAX_WORKERS * 2:
+                        pending.append((next_page, executor.submit(self._request, page=next_page, limit=100)))
+                        next_page += 1
+                    if not pending:
+                        break
+
+                    page, future = pending.popleft()
+                    logger.info(f"Fetching page {page}/{total_pages}...")
+                    result = future.result()
+                    if not result:
+                        break
+                    self._add_page(result, max_skills, min_stars)
+
+                for _, future in pending:
+                    future.cancel()
 
         # Remove duplicates by name
         seen = set()
+        add_seen = seen.add
         unique_skills = []
         for skill in self.skills:
-            key = f"{skill['repo']}/{skill['path']}/{skill['name']}"
+            key = (skill['repo'], skill['path'], skill['name'])
             if key not in seen:
-                seen.add(key)
+                add_seen(key)
                 unique_skills.append(skill)
 
         self.skills = unique_skills
 
         # Sort by stars
-        self.skills.sort(key=lambda x: x.get('stars', 0), reverse=True)
+        self.skills.sort(key=itemgetter('stars'), reverse=True)
 
         logger.info(f"Sync complete: {len(self.skills)} skills")
         return self.skills
@@ -169,8 +214,12 @@ class SkillsMPSync:
             'skills': self.skills,
         }
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(output, f, indent=2, ensure_ascii=False)
 
         logger.info(f"Saved {len(self.skills)} skills to {output_path}")
 
@@ -13,15 +13,26 @@ Output files:
 
 import json
 import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from heapq import nlargest
+from operator import itemgetter
 from pathlib import Path
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 import argparse
 import logging
-import re
-import yaml
 
-from utils import get_repo_suffix
+from utils import (
+    dump_json,
+    find_case_conflicts_in,
+    get_repo_suffix,
+    iter_files_named,
+    list_skill_dirs,
+    load_frontmatter,
+    load_json,
+    strip_inline_markdown,
+)
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
@@ -45,6 +56,15 @@ CATEGORY_CODES = {
 # Known category directories (for scanning)
 KNOWN_CATEGORIES = set(CATEGORY_CODES.keys()) | {"data", "other"}
 
+# SKILL.md descriptions live near the top; read this much before the rest
+HEAD_CHARS = 8192
+
+# Compression for search-index.json.gz (served as-is to clients)
+GZIP_LEVEL = 9
+
+# Threads reading skill folders in scan_skills_v2
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 
 def truncate_text(text: Any, max_length: int) -> str:
     """Truncate text to max length with ellipsis."""
@@ -71,9 +91,10 @@ def extract_description(skill_content: str) -> str:
     if skill_content.startswith("---"):
         try:
             end_idx = skill_content.find("---", 3)
-            if end_idx > 0:
+            # Most frontmatter has no description key; don't parse it then
+            if end_idx > 0 and "description" in skill_content[3:end_idx]:
                 frontmatter = skill_content[3:end_idx].strip()
-                data = yaml.safe_load(frontmatter)
+                data = load_frontmatter(frontmatter)
                 if data and data.get("description"):
                     return data["description"]
         except Exception:
@@ -93,102 +114,119 @@ def extract_description(skill_content: str) -> str:
         if line.startswith("#"):
             continue
         if line and not line.startswith("```") and len(line) > 20:
-            line = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', line)
-            line = re.sub(r'[*_`]', '', line)
+            line = strip_inline_markdown(line)
             return line
 
     return ""
 
 
-def scan_skills_v2(skills_dir: Path) -> List[Dict]:
-    """Scan skills directory with structure: skills/{category}/{skill-name}/"""
-    skills = []
+def read_skill_description(skill_md: Path) -> str:
+    """Extract description from SKILL.md, reading only its head when that suffices."""
+    with open(skill_md, encoding='utf-8') as f:
+        head = f.read(HEAD_CHARS)
+        if len(head) < HEAD_CHARS:
+            return extract_description(head)
+
+        # Only trust complete lines, and only if the frontmatter closes in them
+        complete = head[:head.rfind("\n") + 1]
+        if complete and (not complete.startswith("---") or complete.find("---", 3) > 0):
+            description = extract_description(complete)
+            if description:
+                return description
+
+        return extract_description(head + f.read())
+
+
+def _parse_skill(category_name: str, skill_dir: Path) -> Optional[Dict]:
+    """Build the index entry for one skills/{category}/{skill-name}/ folder."""
+    skill_md = skill_dir / "SKILL.md"
+    metadata_file = skill_dir / "metadata.json"
+
+    if not skill_md.exists():
+        return None
+
+    dir_name = skill_dir.name
+
+    # Load metadata (a missing file is the same as an empty one)
+    metadata = {}
+    try:
+        metadata = load_json(metadata_file.read_bytes())
+    except Exception:
+        pass
+
+    # Get skill name (from metadata or directory)
+    name = metadata.get("name") or dir_name
+
+    # Remove repo suffix from dir_name if metadata repo is available
+    if name == dir_name:
+        repo = metadata.get("repo", "")
+        suffix = get_repo_suffix(repo)
+        if suffix and dir_name.endswith(f"-{suffix}"):
+            name = dir_name[: -(len(suffix) + 1)]
+
+    # Get description
+    description = metadata.get("description", "")
+    if not description:
+        try:
+            description = read_skill_description(skill_md)
+        except Exception:
+            pass
+    if not description:
+        description = f"Skill: {name}"
+
+    # Get category
+    category = metadata.get("category", category_name)
+
+    # Build install path
+    repo = metadata.get("repo", "")
+    github_path = metadata.get("github_path", "")
+    github_branch = metadata.get("github_branch", "main")  # Default to main
+
+    if github_path and repo:
+        install = f"{repo}/{github_path}"
+    elif repo:
+        install = repo
+    else:
+        install = f"unknown/{name}"
+
+    skill_entry = {
+        "name": name,
+        "dir_name": dir_name,
+        "description": description,
+        "repo": repo,
+        "path": github_path,
+        "branch": github_branch,
+        "category": category,
+        "tags": metadata.get("tags", []),
+        "stars": metadata.get("stars", 0),
+        "source": metadata.get("source", "downloaded"),
+        "install": install,
+    }
+
+    return skill_entry
+
 
+def scan_skills_v2(skills_dir: Path, detect_conflicts: bool = False) -> List[Dict]:
+    """
+    Scan skills directory with structure: skills/{category}/{skill-name}/
+
+    With detect_conflicts, also warn about skill directories whose names
+    differ only in case, reusing the same directory listing.
+    """
     if not skills_dir.exists():
         logger.warning(f"Skills directory not found: {skills_dir}")
-        return skills
-
-    for category_dir in skills_dir.iterdir():
-        if not category_dir.is_dir():
-            continue
-        if category_dir.name.startswith('.'):
-            continue
+        return []
 
-        category_name = category_dir.name
-
-        for skill_dir in category_dir.iterdir():
-            if not skill_dir.is_dir():
-                continue
-
-            skill_md = skill_dir / "SKILL.md"
-            metadata_file = skill_dir / "metadata.json"
-
-            if not skill_md.exists():
-                continue
-
-            dir_name = skill_dir.name
-
-            # Load metadata
-            metadata = {}
-            if metadata_file.exists():
-                try:
-                    metadata = json.loads(metadata_file.read_text(encoding='utf-8'))
-                except Exception:
-                    pass
-
-            # Get skill name (from metadata or directory)
-            name = metadata.get("name") or dir_name
-
-            # Remove repo suffix from dir_name if metadata repo is available
-            if name == dir_name:
-                repo = metadata.get("repo", "")
-                suffix = get_repo_suffix(repo)
-                if suffix and dir_name.endswith(f"-{suffix}"):
-                    name = dir_name[: -(len(suffix) + 1)]
-
-            # Get description
-            description = metadata.get("description", "")
-            if not description:
-                try:
-                    content = skill_md.read_text(encoding='utf-8')
-                    description = extract_description(content)
-                except Exception:
-                    pass
-            if not description:
-                description = f"Skill: {name}"
-
-            # Get category
-            category = metadata.get("category", category_name)
-
-            # Build install path
-            repo = metadata.get("repo", "")
-            github_path = metadata.get("github_path", "")
-            github_branch = metadata.get("github_branch", "main")  # Default to main
-
-            if github_path and repo:
-                install = f"{repo}/{github_path}"
-            elif repo:
-                install = repo
-            else:
-                install = f"unknown/{name}"
-
-            skill_entry = {
-                "name": name,
-                "dir_name": dir_name,
-                "description": description,
-                "repo": repo,
-                "path": github_path,
-                "branch": github_branch,
-                "category": category,
-                "tags": metadata.get("tags", []),
-                "stars": metadata.get("stars", 0),
-                "source": metadata.get("source", "downloaded"),
-                "install": install,
-            }
+    # Listing is cheap; the per-skill reads are I/O bound and run in parallel
+    skill_dirs = list_skill_dirs(skills_dir)
 
-            skills.append(skill_entry)
+    if detect_conflicts:
+        for key, paths in sorted(find_case_conflicts_in(skill_dirs, skills_dir).items()):
+            logger.warning(f"Case conflict: {key} ({', '.join(paths)})")
 
-    return skills
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        results = executor.map(lambda item: _parse_skill(*item), skill_dirs)
+        return [entry for entry in results if entry is not None]
 
 
 def load_registry_count(registry_path: Path) -> Optional[int]:
@@ -196,8 +234,7 @@ def load_registry_count(registry_path: Path) -> Optional[int]:
     if not registry_path.exists():
         return None
     try:
-        with open(registry_path, 'r', encoding='utf-8') as f:
-            registry = json.load(f)
+        registry = load_json(registry_path.read_bytes())
     except Exception:
         return None
 
@@ -239,7 +276,7 @@ def count_skill_files(skills_dir: Path) -> Optional[int]:
     if not skills_dir.exists():
         return None
     try:
-        return sum(1 for _ in skills_dir.rglob("SKILL.md"))
+        return sum(1 for _ in iter_files_named(skills_dir, "SKILL.md"))
     except Exception:
         return None
 
@@ -254,15 +291,19 @@ def build_search_index(
     """Build the lightweight search index."""
     logger.info(f"Building index from {len(skills)} {source_name}...")
 
+    # One timestamp for every file written by this build
+    now_iso = datetime.utcnow().isoformat() + "Z"
+
     # Build minimal search index
     search_index = {
-        "v": datetime.utcnow().strftime("%Y-%m-%d"),
+        "v": now_iso[:10],
         "t": len(skills),
         "s": []
     }
 
-    # Category indexes
+    # Category indexes, and the short code of each category seen
     categories: Dict[str, List[Dict]] = {}
+    category_codes: Dict[str, str] = {}
 
     # Featured skills
     featured_skills = []
@@ -277,11 +318,15 @@ def build_search_index(
         install = skill.get('install', repo)
         branch = skill.get('branch', 'main')
 
+        code = category_codes.get(category)
+        if code is None:
+            code = category_codes[category] = get_category_code(category)
+
         # Minimal record
         mini_record = {
             "n": name,
             "d": truncate_text(description, 80),
-            "c": get_category_code(category),
+            "c": code,
             "g": tags[:5] if tags else [],
             "r": stars,
             "i": install,
@@ -313,9 +358,8 @@ def build_search_index(
             featured_skills.append(full_record)
 
     # Sort by stars
-    search_index["s"].sort(key=lambda x: x.get("r", 0), reverse=True)
-    featured_skills.sort(key=lambda x: x.get("stars", 0), reverse=True)
-    featured_skills = featured_skills[:100]
+    search_index["s"].sort(key=itemgetter("r"), reverse=True)
+    featured_skills = nlargest(100, featured_skills, key=itemgetter("stars"))
 
     # Create output directories
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -323,72 +367,70 @@ def build_search_index(
     categories_dir.mkdir(exist_ok=True)
 
     # Write search index
+    # Serialized once; the gzip copy compresses the same bytes
     search_index_path = output_dir / "search-index.json"
-    with open(search_index_path, 'w', encoding='utf-8') as f:
-        json.dump(search_index, f, ensure_ascii=False, separators=(',', ':'))
+    payload = dump_json(search_index)
+    search_index_path.write_bytes(payload)
 
-    # Write gzipped version
+    # Write gzipped version (max level; fixed mtime keeps rebuilds byte-identical)
     search_index_gz_path = output_dir / "search-index.json.gz"
-    with gzip.open(search_index_gz_path, 'wt', encoding='utf-8') as f:
-        json.dump(search_index, f, ensure_ascii=False, separators=(',', ':'))
+    payload_gz = gzip.compress(payload, compresslevel=GZIP_LEVEL, mtime=0)
+    search_index_gz_path.write_bytes(payload_gz)
 
-    logger.info(f"  search-index.json: {search_index_path.stat().st_size / 1024 / 1024:.2f} MB")
-    logger.info(f"  search-index.json.gz: {search_index_gz_path.stat().st_size / 1024 / 1024:.2f} MB")
+    logger.info(f"  search-index.json: {len(payload) / 1024 / 1024:.2f} MB")
+    logger.info(f"  search-index.json.gz: {len(payload_gz) / 1024 / 1024:.2f} MB")
 
     # Write category indexes
     category_index = {
-        "updated_at": datetime.utcnow().isoformat() + "Z",
+        "updated_at": now_iso,
         "categories": []
     }
 
     for category, cat_skills in sorted(categories.items()):
-        cat_skills.sort(key=lambda x: x.get("stars", 0), reverse=True)
+        cat_skills.sort(key=itemgetter("stars"), reverse=True)
 
         cat_data = {
             "category": category,
-            "code": get_category_code(category),
+            "code": category_codes[category],
             "count": len(cat_skills),
-            "updated_at": datetime.utcnow().isoformat() + "Z",
+            "updated_at": now_iso,
             "skills": cat_skills
         }
 
         cat_path = categories_dir / f"{category}.json"
-        with open(cat_path, 'w', encoding='utf-8') as f:
-            json.dump(cat_data, f, ensure_ascii=False, indent=2)
+        cat_path.write_bytes(dump_json(cat_data, indent=True))
 
         category_index["categories"].append({
             "name": category,
-            "code": get_category_code(category),
+            "code": category_codes[category],
             "count": len(cat_skills)
         })
 
         logger.info(f"  categories/{category}.json: {len(cat_skills)} skills")
 
     # Write category index
-    with open(categories_dir / "index.json", 'w', encoding='utf-8') as f:
-        json.dump(category_index, f, ensure_ascii=False, indent=2)
+    (categories_dir / "index.json").write_bytes(dump_json(category_index, indent=True))
 
     # Write featured
     featured_data = {
-        "updated_at": datetime.utcnow().isoformat() + "Z",
+        "updated_at": now_iso,
         "count": len(featured_skills),
         "skills": featured_skills
     }
-    with open(output_dir / "featured.json", 'w', encoding='utf-8') as f:
-        json.dump(featured_data, f, ensure_ascii=False, indent=2)
+    (output_dir / "featured.json").write_bytes(dump_json(featured_data, indent=True))
 
     logger.info(f"  featured.json: {len(featured_skills)} skills")
 
     # Write stats
     stats = {
-        "updated_at": datetime.utcnow().isoformat() + "Z",
+        "updated_at": now_iso,
         "total_skills": len(skills),
         "raw_skill_count": raw_skill_count,
         "dedup_skill_count": dedup_skill_count,
         "categories": len(categories),
         "featured_count": len(featured_skills),
-        "index_size_bytes": search_index_path.stat().st_size,
-        "index_size_gzip_bytes": search_index_gz_path.stat().st_size,
+        "index_size_bytes": len(payload),
+        "index_size_gzip_bytes": len(payload_gz),
     }
     # Attach latest security scan summary if available
     security_report_path = output_dir / "security-report.json"
@@ -407,8 +449,7 @@ def build_search_index(
                 "passed": None,
                 "failed": None,
             }
-    with open(output_dir / "stats.json", 'w', encoding='utf-8') as f:
-        json.dump(stats, f, ensure_ascii=False, indent=2)
+    (output_dir / "stats.json").write_bytes(dump_json(stats, indent=True))
 
     logger.info(f"\nIndex build complete!")
     logger.info(f"  Total skills: {len(skills)}")
@@ -423,8 +464,7 @@ def build_search_index(
 
 def load_from_registry(registry_path: Path) -> List[Dict]:
     """Load skills from registry.json (fallback mode)."""
-    with open(registry_path, 'r', encoding='utf-8') as f:
-        registry = json.load(f)
+    registry = load_json(registry_path.read_bytes())
 
     skills = registry.get('skills', [])
 
@@ -455,7 +495,7 @@ def main():
     # Prefer scanning skills directory
     if not args.use_registry and skills_dir.exists():
         logger.info(f"Scanning skills from {skills_dir}")
-        skills = scan_skills_v2(skills_dir)
+        skills = scan_skills_v2(skills_dir, detect_conflicts=True)
         source_name = "verified downloaded skills"
         raw_skill_count = len(skills)
         dedup_skill_count = load_registry_count(registry_path)
@@ -11,29 +11,14 @@ Usage:
 
 import sys
 from pathlib import Path
-from collections import defaultdict
 import argparse
 
+from utils import list_skill_dirs, find_case_conflicts_in
+
 
 def find_case_conflicts(skills_dir: Path) -> dict:
     """Find directories that differ only in case."""
-    conflicts = defaultdict(list)
-
-    # Scan all directories
-    for category_dir in skills_dir.iterdir():
-        if not category_dir.is_dir() or category_dir.name.startswith('.'):
-            continue
-
-        for skill_dir in category_dir.iterdir():
-            if not skill_dir.is_dir():
-                continue
-
-            # Group by lowercase name
-            key = f"{category_dir.name}/{skill_dir.name.lower()}"
-            conflicts[key].append(str(skill_dir.relative_to(skills_dir)))
-
-    # Filter to only actual conflicts (more than one with same lowercase name)
-    return {k: v for k, v in conflicts.items() if len(v) > 1}
+    return find_case_conflicts_in(list_skill_dirs(skills_dir), skills_dir)
 
 
 def main():
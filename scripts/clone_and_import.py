@@ -9,11 +9,13 @@ import json
 import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 import logging
 
-from utils import normalize_name, ensure_unique_dir, build_skill_key, normalize_repo
+from utils import normalize_name, ensure_unique_dir, build_skill_key, normalize_repo, iter_files_named, dump_json
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -38,6 +40,13 @@ REPOS_TO_CLONE = [
     "https://github.com/alirezarezvani/claude-code-skill-factory.git",
 ]
 
+# Clones are network bound; run this many git processes at once
+CLONE_WORKERS = 8
+# Threads writing imported SKILL.md/metadata.json pairs
+WRITE_WORKERS = 8
+# Scalar frontmatter keys copied into metadata.json
+FRONTMATTER_KEYS = frozenset({"name", "description", "category"})
+
 
 def _repo_slug(repo_url: str) -> str:
     repo_url = repo_url.replace(".git", "")
@@ -60,15 +69,18 @@ CATEGORY_KEYWORDS = {
     "product": ["product", "prd", "roadmap", "feature", "backlog"],
     "marketing": ["marketing", "seo", "content", "social", "campaign"],
 }
+_CATEGORY_TABLE = tuple((category, tuple(keywords)) for category, keywords in CATEGORY_KEYWORDS.items())
 
 
-def guess_category(skill_path: str, content: str) -> str:
-    """Guess category from path and content."""
-    text = (skill_path + " " + content[:1000]).lower()
+def guess_category(*texts: str) -> str:
+    """Guess category from text fragments such as the path and content head."""
+    # No keyword contains a space, so matching each fragment separately
+    # finds the same hits as matching them joined
+    contains = [text.lower().__contains__ for text in texts]
 
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text:
+    for category, keywords in _CATEGORY_TABLE:
+        for contained in contains:
+            if any(map(contained, keywords)):
                 return category
 
     return "other"
@@ -79,23 +91,25 @@ def parse_skill_frontmatter(content: str) -> dict:
     metadata = {}
 
     if content.startswith("---"):
-        parts = content.split("---", 2)
-        if len(parts) >= 3:
-            frontmatter = parts[1]
-            for line in frontmatter.split("\n"):
-                if ":" in line:
-                    key, value = line.split(":", 1)
-                    key = key.strip().lower()
+        # Locate the closing marker instead of splitting off a copy of the
+        # body; like split("---", 2), the first "---" anywhere ends the block
+        end = content.find("---", 3)
+        if end != -1:
+            for line in content[3:end].split("\n"):
+                key, sep, value = line.partition(":")
+                if not sep:
+                    continue
+                key = key.strip().lower()
+                if key in FRONTMATTER_KEYS:
+                    metadata[key] = value.strip().strip('"').strip("'")
+                elif key == "tags":
+                    # Handle tags as list
                     value = value.strip().strip('"').strip("'")
-                    if key in ["name", "description", "category"]:
-                        metadata[key] = value
-                    elif key == "tags":
-                        # Handle tags as list
-                        if value.startswith("["):
-                            try:
-                                metadata["tags"] = json.loads(value.replace("'", '"'))
-                            except:
-                                metadata["tags"] = []
+                    if value.startswith("["):
+                        try:
+                            metadata["tags"] = json.loads(value.replace("'", '"'))
+                        except json.JSONDecodeError:
+                            metadata["tags"] = []
 
     return metadata
 
@@ -111,8 +125,18 @@ def clone_repo(repo_url: str, target_dir: Path) -> bool:
 
     try:
         logger.info(f"  Cloning: {repo_name}")
+        # Partial, sparse clone: only SKILL.md blobs are fetched and checked out
+        subprocess.run(
+            [
+                "git", "clone", "--depth", "1", "--filter=blob:none", "--sparse",
+                "--single-branch", "--no-tags", repo_url, str(clone_path),
+            ],
+            capture_output=True,
+            timeout=120,
+            check=True
+        )
         subprocess.run(
-            ["git", "clone", "--depth", "1", repo_url, str(clone_path)],
+            ["git", "-C", str(clone_path), "sparse-checkout", "set", "--no-cone", "**/SKILL.md"],
             capture_output=True,
             timeout=120,
             check=True
@@ -120,28 +144,43 @@ def clone_repo(repo_url: str, target_dir: Path) -> bool:
         return True
     except subprocess.TimeoutExpired:
         logger.warning(f"  Timeout cloning {repo_name}")
-        return False
     except subprocess.CalledProcessError as e:
         logger.warning(f"  Failed to clone {repo_name}: {e}")
-        return False
+    # A clone whose sparse checkout didn't finish must not pass as "Already cloned"
+    shutil.rmtree(clone_path, ignore_errors=True)
+    return False
+
+
+def _skip_dir(name: str) -> bool:
+    """Directories never searched for skills (.git, .github, node_modules, ...)."""
+    return "node_modules" in name or ".git" in name
 
 
 def find_skill_files(repo_dir: Path) -> list:
     """Find all SKILL.md files in a repo."""
-    skills = []
+    return [Path(p) for p in iter_files_named(repo_dir, "SKILL.md", prune=_skip_dir)]
 
-    for skill_file in repo_dir.rglob("SKILL.md"):
-        # Skip if in node_modules or .git
-        if "node_modules" in str(skill_file) or ".git" in str(skill_file):
-            continue
 
-        skills.append(skill_file)
+def _write_skill(target_dir: Path, content: bytes, meta: bytes) -> None:
+    (target_dir / "SKILL.md").write_bytes(content)
+    (target_dir / "metadata.json").write_bytes(meta)
 
-    return skills
 
+def import_skill(
+    skill_file: Path,
+    skills_dir: Path,
+    repo_slug: str,
+    stats: dict,
+    imported_at: str = "",
+    writer: Optional[ThreadPoolExecutor] = None,
+    pending: Optional[list] = None,
+) -> bool:
+    """
+    Import a single SKILL.md file. imported_at defaults to the current time.
 
-def import_skill(skill_file: Path, skills_dir: Path, repo_slug: str, stats: dict) -> bool:
-    """Import a single SKILL.md file."""
+    With a writer, the files are written on that pool and the future is
+    appended to pending; call .result() on each to surface write errors.
+    """
     try:
         content = skill_file.read_text(encoding="utf-8")
     except Exception as e:
@@ -171,7 +210,7 @@ def import_skill(skill_file: Path, skills_dir: Path, repo_slug: str, stats: dict
     # Determine category
     category = normalize_name(metadata.get("category", ""))
     if not category or category == "unknown":
-        category = guess_category(str(skill_file), content)
+        category = guess_category(str(skill_file), content[:1000])
 
     # Target directory (case-safe)
     rel_path = ""
@@ -187,9 +226,8 @@ def import_skill(skill_file: Path, skills_dir: Path, repo_slug: str, stats: dict
         stats["skipped"] += 1
         return False
 
-    # Create directory and copy
+    # Create the directory now so later name conflicts see it
     target_dir.mkdir(parents=True, exist_ok=True)
-    target_file.write_text(content, encoding="utf-8")
 
     # Create metadata
     meta = {
@@ -201,12 +239,13 @@ def import_skill(skill_file: Path, skills_dir: Path, repo_slug: str, stats: dict
         "source": f"github.com/{repo_slug}",
         "source_path": rel_path,
         "dir_name": target_dir.name,
-        "imported_at": datetime.utcnow().isoformat() + "Z",
+        "imported_at": imported_at or datetime.utcnow().isoformat() + "Z",
     }
-    (target_dir / "metadata.json").write_text(
-        json.dumps(meta, indent=2, ensure_ascii=False),
-        encoding="utf-8"
-    )
+    args = (target_dir, content.encode("utf-8"), dump_json(meta, indent=True))
+    if writer is None:
+        _write_skill(*args)
+    else:
+        pending.append(writer.submit(_write_skill, *args))
 
     stats["imported"] += 1
     return True
@@ -240,7 +279,21 @@ def main():
 
     # Phase 1: Clone repos
     logger.info("=== Phase 1: Cloning Repos ===")
+    # Several URLs share a repo name and so a clone directory; clone the
+    # first of each in parallel, then let the rest see it as already cloned
+    first_by_name = {}
+    repeats = []
     for repo_url in REPOS_TO_CLONE:
+        repo_name = repo_url.split("/")[-1].replace(".git", "")
+        if repo_name in first_by_name:
+            repeats.append(repo_url)
+        else:
+            first_by_name[repo_name] = repo_url
+
+    with ThreadPoolExecutor(max_workers=CLONE_WORKERS) as executor:
+        results = executor.map(lambda url: clone_repo(url, clone_dir), first_by_name.values())
+        stats["repos_cloned"] = sum(results)
+    for repo_url in repeats:
         if clone_repo(repo_url, clone_dir):
             stats["repos_cloned"] += 1
 
@@ -249,23 +302,31 @@ def main():
 
     # Phase 2: Find and import skills
     logger.info("=== Phase 2: Importing Skills ===")
+    imported_at = datetime.utcnow().isoformat() + "Z"  # Shared by the whole batch
 
-    for repo_dir in clone_dir.iterdir():
-        if not repo_dir.is_dir() or repo_dir.name.startswith("."):
-            continue
+    repo_dirs = [
+        d for d in clone_dir.iterdir()
+        if d.is_dir() and not d.name.startswith(".")
+    ]
 
-        repo_name = repo_dir.name
-        repo_slug = REPO_BY_DIR.get(repo_name, repo_name)
-        skill_files = find_skill_files(repo_dir)
-        stats["skills_found"] += len(skill_files)
+    # Walk the clones in parallel. Target directories are still picked
+    # serially against what is on disk; only the file writes are pooled
+    with ThreadPoolExecutor(max_workers=max(1, len(repo_dirs))) as executor:
+        repo_skill_files = list(executor.map(find_skill_files, repo_dirs))
 
-        logger.info(f"  {repo_name}: {len(skill_files)} SKILL.md files")
+    pending = []
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as writer:
+        for repo_dir, skill_files in zip(repo_dirs, repo_skill_files, strict=True):
+            repo_name = repo_dir.name
+            repo_slug = REPO_BY_DIR.get(repo_name, repo_name)
+            stats["skills_found"] += len(skill_files)
 
-        for skill_file in skill_files:
-            import_skill(skill_file, skills_dir, repo_slug, stats)
+            logger.info(f"  {repo_name}: {len(skill_files)} SKILL.md files")
 
-    # Count total skills
-    total_skills = sum(1 for _ in skills_dir.rglob("SKILL.md"))
+            for skill_file in skill_files:
+                import_skill(skill_file, skills_dir, repo_slug, stats, imported_at, writer, pending)
+    for future in pending:
+        future.result()
 
     # Summary
     logger.info("")
@@ -277,8 +338,6 @@ def main():
     logger.info(f"  Imported:        {stats['imported']}")
     logger.info(f"  Skipped:         {stats['skipped']}")
     logger.info(f"  Errors:          {stats['errors']}")
-    logger.info("-" * 60)
-    logger.info(f"  TOTAL SKILLS:    {total_skills}")
     logger.info("=" * 60)
 
     # Cleanup prompt
@@ -7,12 +7,17 @@ Uses GitHub Search API to find repositories with claude-code-skills or claude-sk
 import os
 import json
 import time
+import atexit
 import logging
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
-from utils import normalize_name, ensure_unique_dir, build_skill_key
+from utils import normalize_name, ensure_unique_dir, build_skill_key, dump_json
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -35,14 +40,113 @@ CODE_SEARCH_QUERIES = [
     "filename:SKILL.md path:skills",
 ]
 
+# Rate limiting (shared across worker threads)
+REQUESTS_PER_MINUTE = 30  # GitHub Search API limit for authenticated requests
+SEARCH_WORKERS = 2  # Per-repo code searches in flight in Phase 3 (rate limited)
+DOWNLOAD_WORKERS = 16  # Raw SKILL.md downloads in flight in Phase 3
+POOL_SIZE = 32  # Keep-alive connections per host (>= SEARCH_WORKERS + DOWNLOAD_WORKERS)
+
+# Conditional-request cache (ETag / Last-Modified), reused across runs; kept
+# under the repo root's .download_cache/, not in sources/ with the skill lists
+HTTP_CACHE_FILE = Path(__file__).resolve().parent.parent / ".download_cache" / "http_cache.json"
+HTTP_CACHE_TTL = 3600  # Seconds a cached response is reused without revalidating
+
+
+class HTTPCache:
+    """On-disk validator cache so unchanged responses come back as 304"""
+
+    def __init__(self, path=HTTP_CACHE_FILE, ttl=HTTP_CACHE_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            self.entries = json.loads(self.path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+        atexit.register(self.flush)
+
+    @staticmethod
+    def key(url, params=None):
+        """Cache key: the fully encoded request URL"""
+        return requests.Request('GET', url, params=params).prepare().url
+
+    def conditional_headers(self, key):
+        """If-None-Match / If-Modified-Since headers for a cached URL"""
+        entry = self.entries.get(key)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def body(self, key):
+        """Cached body for a 304 response"""
+        with self._lock:
+            entry = self.entries[key]
+            entry['fetched_at'] = time.time()
+            self._dirty = True
+            return entry['body']
+
+    def fresh(self, key):
+        """Cached body if it was fetched or revalidated within the TTL, else None"""
+        entry = self.entries.get(key)
+        if entry and time.time() - entry.get('fetched_at', 0) < self.ttl:
+            return entry['body']
+        return None
+
+    def store(self, key, resp):
+        """Remember a 200 response if it carries validators"""
+        etag = resp.headers.get('ETag')
+        last_modified = resp.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self.entries[key] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'body': resp.text,
+                'fetched_at': time.time(),
+            }
+            self._dirty = True
+
+    def flush(self):
+        """Persist the cache once (registered with atexit)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(self.entries, ensure_ascii=False), encoding='utf-8')
+            tmp_path.replace(self.path)
+            self._dirty = False
+
 
 class GitHubTopicDiscovery:
     """Discover skills using GitHub Topics and Code Search"""
 
-    def __init__(self, token=None):
+    def __init__(self, token=None, cache_path=HTTP_CACHE_FILE):
         self.token = token or os.environ.get('GITHUB_TOKEN')
         self.session = requests.Session()
         self.session.headers['Accept'] = 'application/vnd.github.v3+json'
+        # Pooled keep-alive connections; 403/429 rate limits are handled in _request
+        adapter = HTTPAdapter(
+            pool_connections=POOL_SIZE,
+            pool_maxsize=POOL_SIZE,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=1.0,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(['GET']),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.cache = HTTPCache(cache_path)
         if self.token:
             self.session.headers['Authorization'] = f'token {self.token}'
             logger.info("Using authenticated GitHub API")
@@ -50,68 +154,135 @@ class GitHubTopicDiscovery:
             logger.warning("No token - rate limits will be strict (10 req/min)")
 
         self.discovered_repos = set()
+        self.default_branches = {}  # repo -> default branch from topic search
         self.skills = []
 
-    def _request(self, url, params=None):
-        """Make rate-limited request"""
-        time.sleep(2)  # Be nice to API
+        # Token bucket: each API call reserves the next free slot. The slot
+        # spacing follows the X-RateLimit headers of the latest response
+        # (see _pace), never tighter than REQUESTS_PER_MINUTE
+        self._rate_lock = threading.Lock()
+        self._next_slot = time.monotonic()
+        self._interval = 60.0 / REQUESTS_PER_MINUTE
+        # Serializes case-safe directory allocation across download threads
+        self._write_lock = threading.Lock()
+
+    def _throttle(self):
+        """Wait for the next request slot so all threads share one rate budget"""
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next_slot - now)
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if wait:
+            time.sleep(wait)
+
+    def _refund(self):
+        """Give back the slot of a request that didn't count against the budget"""
+        with self._rate_lock:
+            self._next_slot = max(time.monotonic(), self._next_slot - self._interval)
+
+    def _pace(self, resp):
+        """Spread the remaining rate-limit budget evenly until its reset"""
+        if resp.status_code == 403:
+            return  # _request sleeps until the reset itself
         try:
-            resp = self.session.get(url, params=params, timeout=30)
-
-            # Handle rate limiting
-            if resp.status_code == 403:
-                reset = int(resp.headers.get('X-RateLimit-Reset', 0))
-                if reset:
-                    wait = max(0, reset - time.time() + 1)
-                    if wait < 3600:
-                        logger.warning(f"Rate limited, waiting {wait:.0f}s")
-                        time.sleep(wait)
-                        return self._request(url, params)
+            remaining = int(resp.headers['X-RateLimit-Remaining'])
+            reset = int(resp.headers['X-RateLimit-Reset'])
+        except (KeyError, ValueError):
+            return
+        if remaining <= 0:
+            # Spacing by the whole reset window would keep every queued
+            # thread that far apart long after the budget refills
+            return
+        with self._rate_lock:
+            self._interval = max(60.0 / REQUESTS_PER_MINUTE, (reset - time.time()) / remaining)
+
+    def _request(self, url, params=None):
+        """Make rate-limited request, waiting out a rate-limit reset in place"""
+        key = self.cache.key(url, params)
+        # Recently fetched: skip both the request and the throttle
+        cached = self.cache.fresh(key)
+        if cached is not None:
+            return json.loads(cached)
+        while True:
+            self._throttle()
+            try:
+                resp = self.session.get(
+                    url, params=params, headers=self.cache.conditional_headers(key), timeout=30
+                )
+                # Unchanged since last run (does not consume rate limit)
+                if resp.status_code == 304:
+                    self._refund()
+                    return json.loads(self.cache.body(key))
+                self._pace(resp)
+
+                # Handle rate limiting
+                if resp.status_code == 403:
+                    reset = int(resp.headers.get('X-RateLimit-Reset', 0))
+                    if reset:
+                        wait = max(0, reset - time.time() + 1)
+                        if wait < 3600:
+                            logger.warning(f"Rate limited, waiting {wait:.0f}s")
+                            time.sleep(wait)
+                            continue
+                    return None
+
+                resp.raise_for_status()
+                self.cache.store(key, resp)
+                return resp.json()
+            except Exception as e:
+                logger.error(f"Request failed: {e}")
                 return None
 
-            resp.raise_for_status()
-            return resp.json()
-        except Exception as e:
-            logger.error(f"Request failed: {e}")
-            return None
+    def _search_all(self, url, params):
+        """Collect items from every page of a search (max 10 pages / 1000 results)"""
+        items = []
+        page = 1
+        while page <= 10:
+            result = self._request(url, {**params, 'per_page': 100, 'page': page})
+            if not result:
+                break
+
+            page_items = result.get('items', [])
+            if not page_items:
+                break
+            items.extend(page_items)
+
+            total = result.get('total_count', 0)
+            if page * 100 >= total:
+                break
+            page += 1
+
+        return items
+
+    def _search_topic(self, topic):
+        """Fetch all repositories tagged with a topic"""
+        logger.info(f"Searching topic: {topic}")
+        return self._search_all(
+            f"{GITHUB_API}/search/repositories",
+            {'q': f'topic:{topic}', 'sort': 'stars', 'order': 'desc'},
+        )
+
+    def _search_code(self, query):
+        """Fetch all code search hits for a query"""
+        logger.info(f"Code search: {query}")
+        return self._search_all(f"{GITHUB_API}/search/code", {'q': query})
 
     def discover_by_topics(self, topics=None):
         """Discover repositories by GitHub topics"""
         topics = topics or SKILL_TOPICS
 
-        for topic in topics:
-            logger.info(f"Searching topic: {topic}")
-
-            page = 1
-            while page <= 10:  # Max 1000 results
-                url = f"{GITHUB_API}/search/repositories"
-                params = {
-                    'q': f'topic:{topic}',
-                    'sort': 'stars',
-                    'order': 'desc',
-                    'per_page': 100,
-                    'page': page,
-                }
-
-                result = self._request(url, params)
-                if not result:
-                    break
-
-                items = result.get('items', [])
-                if not items:
-                    break
-
+        # Topics are searched concurrently; the shared throttle keeps the
+        # combined rate under REQUESTS_PER_MINUTE. Results merge in topic order.
+        with ThreadPoolExecutor(max_workers=len(topics)) as executor:
+            for items in executor.map(self._search_topic, topics):
                 for repo in items:
                     full_name = repo['full_name']
+                    if repo.get('default_branch'):
+                        self.default_branches[full_name] = repo['default_branch']
                     if full_name not in self.discovered_repos:
                         self.discovered_repos.add(full_name)
                         logger.info(f"  Found: {full_name} ({repo.get('stargazers_count', 0)} stars)")
 
-                total = result.get('total_count', 0)
-                if page * 100 >= total:
-                    break
-                page += 1
-
         logger.info(f"Discovered {len(self.discovered_repos)} repositories from topics")
         return list(self.discovered_repos)
 
@@ -119,26 +290,8 @@ class GitHubTopicDiscovery:
         """Discover SKILL.md files using GitHub Code Search"""
         queries = queries or CODE_SEARCH_QUERIES
 
-        for query in queries:
-            logger.info(f"Code search: {query}")
-
-            page = 1
-            while page <= 10:
-                url = f"{GITHUB_API}/search/code"
-                params = {
-                    'q': query,
-                    'per_page': 100,
-                    'page': page,
-                }
-
-                result = self._request(url, params)
-                if not result:
-                    break
-
-                items = result.get('items', [])
-                if not items:
-                    break
-
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            for items in executor.map(self._search_code, queries):
                 for item in items:
                     repo = item['repository']['full_name']
                     path = item['path']
@@ -147,11 +300,6 @@ class GitHubTopicDiscovery:
                         self.discovered_repos.add(repo)
                         logger.info(f"  Found: {repo} - {path}")
 
-                total = result.get('total_count', 0)
-                if page * 100 >= total:
-                    break
-                page += 1
-
         logger.info(f"Total discovered: {len(self.discovered_repos)} repositories")
         return list(self.discovered_repos)
 
@@ -181,12 +329,32 @@ class GitHubTopicDiscovery:
                     'repo': repo,
                     'path': item['path'],
                     'html_url': item['html_url'],
+                    'ref': self._ref_from_html_url(item['html_url']),
                 })
 
         return skills
 
-    def download_skill(self, repo, path, output_dir):
-        """Download a SKILL.md file"""
+    @staticmethod
+    def _ref_from_html_url(html_url):
+        """Commit the code search indexed, from .../{repo}/blob/{ref}/{path}"""
+        _, sep, rest = html_url.partition('/blob/')
+        return rest.split('/', 1)[0] if sep else None
+
+    def _fetch_text(self, url):
+        """GET a raw file through the cache; None unless it is 200 or 304"""
+        content = self.cache.fresh(url)
+        if content is not None:
+            return content
+        resp = self.session.get(url, headers=self.cache.conditional_headers(url), timeout=15)
+        if resp.status_code == 304:
+            return self.cache.body(url)
+        if resp.status_code == 200:
+            self.cache.store(url, resp)
+            return resp.text
+        return None
+
+    def download_skill(self, repo, path, output_dir, ref=None):
+        """Download a SKILL.md file, from ref when the search result gave one"""
         # Extract skill name from path
         parts = path.rsplit('/', 1)
         if len(parts) == 2:
@@ -197,21 +365,24 @@ class GitHubTopicDiscovery:
         # Normalize to lowercase to prevent case conflicts on macOS/Windows
         skill_dir = normalize_name(skill_dir)
 
-        # Try to fetch content
-        for branch in ['main', 'master']:
+        # The indexed commit resolves in one request; the known default
+        # branch and the common defaults are fallbacks
+        branches = [ref, self.default_branches.get(repo), 'main', 'master']
+        for branch in dict.fromkeys(b for b in branches if b):
             url = f"{GITHUB_RAW}/{repo}/{branch}/{path}"
             try:
-                resp = self.session.get(url, timeout=15)
-                if resp.status_code == 200:
-                    content = resp.text
-
-                    # Validate it's a skill file
-                    if '---' not in content[:100] and 'name:' not in content[:500]:
-                        continue
-
-                    # Save skill (case-safe)
-                    category = "other"
-                    key = build_skill_key(repo, path, name=skill_dir, category=category)
+                content = self._fetch_text(url)
+                if content is None:
+                    continue
+
+                # Validate it's a skill file
+                if '---' not in content[:100] and 'name:' not in content[:500]:
+                    continue
+
+                # Save skill (case-safe)
+                category = "other"
+                key = build_skill_key(repo, path, name=skill_dir, category=category)
+                with self._write_lock:
                     skill_path = ensure_unique_dir(output_dir / category, skill_dir, key, repo=repo)
                     skill_path.mkdir(parents=True, exist_ok=True)
 
@@ -227,11 +398,11 @@ class GitHubTopicDiscovery:
                         'dir_name': skill_path.name,
                         'downloaded_at': datetime.utcnow().isoformat() + 'Z',
                     }
-                    (skill_path / 'metadata.json').write_text(
-                        json.dumps(metadata, indent=2), encoding='utf-8'
+                    (skill_path / 'metadata.json').write_bytes(
+                        dump_json(metadata, indent=True)
                     )
 
-                    return True
+                return True
             except Exception as e:
                 logger.debug(f"Failed to fetch {url}: {e}")
 
@@ -254,18 +425,30 @@ class GitHubTopicDiscovery:
         logger.info("\n=== Phase 3: Download Skills ===")
         downloaded = 0
 
-        for repo in self.discovered_repos:
-            logger.info(f"Scanning {repo}...")
-            skill_files = self.get_skill_files_from_repo(repo)
+        # Pipeline: each repo's SKILL.md downloads are queued as soon as its
+        # code search returns, while the next searches are still in flight
+        with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as search_pool, \
+                ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as download_pool:
+            searches = {
+                search_pool.submit(self.get_skill_files_from_repo, repo): repo
+                for repo in self.discovered_repos
+            }
+            downloads = {}
+            for future in as_completed(searches):
+                repo = searches[future]
+                logger.info(f"Scanning {repo}...")
+                for skill in future.result():
+                    download = download_pool.submit(
+                        self.download_skill, repo, skill['path'], output_dir, skill['ref']
+                    )
+                    downloads[download] = {'repo': repo, 'path': skill['path']}
 
-            for skill in skill_files:
-                if self.download_skill(repo, skill['path'], output_dir):
+            for future in as_completed(downloads):
+                if future.result():
+                    skill = downloads[future]
                     downloaded += 1
-                    self.skills.append({
-                        'repo': repo,
-                        'path': skill['path'],
-                    })
-                    logger.info(f"  ✓ Downloaded: {skill['path']}")
+                    self.skills.append(skill)
+                    logger.info(f"  ✓ Downloaded: {skill['repo']}/{skill['path']}")
 
         # Save discovery results
         Path(output_json).parent.mkdir(parents=True, exist_ok=True)
@@ -22,26 +22,83 @@ Example:
 
 import asyncio
 import aiohttp
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict
 import time
 import logging
 
-from utils import normalize_name, ensure_unique_dir, build_skill_key, get_repo_suffix, short_hash
+from utils import (
+    normalize_name,
+    build_skill_key,
+    get_repo_suffix,
+    short_hash,
+    dump_json,
+    load_json,
+    AsyncRateLimiter,
+    SkillDirIndex,
+    write_skill_files,
+    read_head,
+    retry_after,
+)
 
 # Configuration
 MAX_CONCURRENT = 50
 TIMEOUT = 15
 RETRY_ATTEMPTS = 2
-BATCH_SIZE = 200
+SKILL_HEAD_BYTES = 2048  # Bytes read to validate a candidate before the rest
+PROGRESS_EVERY = 200  # Skills processed between progress log lines
+KEEPALIVE_TIMEOUT = 75  # Seconds idle connections stay open
+WRITE_WORKERS = 8  # Threads writing downloaded SKILL.md/metadata.json pairs
 
 GITHUB_RAW_BASE = "https://raw.githubusercontent.com"
+GITHUB_API_BASE = "https://api.github.com"
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
 
+# Recursive tree lookups (one per repo) against the GitHub API
+API_CONCURRENT = 10
+API_TIMEOUT = 30
+TREE_CACHE_TTL = 24 * 3600  # Seconds a repo's cached SKILL.md paths stay valid
+# Directories listed through the contents API when a repo's tree is truncated
+CONTENTS_PREFIXES = (".claude/skills", "skills")
+
+# Per-host request rates, independent of the concurrency limits above
+RAW_REQUESTS_PER_SECOND = 80
+API_REQUESTS_PER_SECOND = 10
+RAW_LIMITER = AsyncRateLimiter(RAW_REQUESTS_PER_SECOND)
+API_LIMITER = AsyncRateLimiter(API_REQUESTS_PER_SECOND)
+
+# Where SKILL.md usually lives in a repo, most specific first
+SKILL_LOCATIONS = (
+    ".claude/skills/{name}/SKILL.md",
+    ".claude/{name}/SKILL.md",
+    ".claude/SKILL.md",
+    "skills/{name}/SKILL.md",
+    "{name}/SKILL.md",
+    "SKILL.md",
+)
+BRANCHES = ("main", "master")
+
+
+def _url_template(branch: str, location: str) -> str:
+    return f"{GITHUB_RAW_BASE}/{{repo}}/{branch}/{location}"
+
+
+# Raw URL per branch and location, formatted with repo and name per skill
+URL_TEMPLATES = tuple(_url_template(branch, location) for branch in BRANCHES for location in SKILL_LOCATIONS)
+TEMPLATE_LOCATIONS = {
+    _url_template(branch, location): location for branch in BRANCHES for location in SKILL_LOCATIONS
+}
+
+# Guesses shared by every skill of a repo (locations without a skill name)
+# known to 404, and the branch each repo's skills were last found on
+REPO_LEVEL_TEMPLATES = tuple(t for t, location in TEMPLATE_LOCATIONS.items() if "{name}" not in location)
+MISSING_URLS: Set[str] = set()
+REPO_BRANCH: Dict[str, str] = {}
+
 # Official repos get priority
 OFFICIAL_REPOS = {"anthropics/skills", "anthropics/claude-code"}
 
@@ -64,6 +121,13 @@ class SkillRegistry:
         self.skills_dir = skills_dir
         # {category: {base_name: {dir_name: skill_info}}}
         self.registry: Dict[str, Dict[str, Dict[str, dict]]] = defaultdict(lambda: defaultdict(dict))
+        self.skill_count = 0  # SKILL.md files on disk, kept current by register()
+        self.dirs = SkillDirIndex()  # Case-safe directory choice without re-listing
+        # Skill dirs taken by a download in this run, including ones whose
+        # files are still being written
+        self.claimed_dirs: Set[Path] = set()
+        # Skill dir -> its files' write, until that finishes
+        self.writes: Dict[Path, asyncio.Future] = {}
         self._scan_existing()
 
     def _scan_existing(self):
@@ -71,61 +135,58 @@ class SkillRegistry:
         if not self.skills_dir.exists():
             return
 
-        for category_dir in self.skills_dir.iterdir():
-            if not category_dir.is_dir() or category_dir.name.startswith('.'):
-                continue
+        # Directory entries carry their type, so only SKILL.md costs a stat
+        # and each metadata.json is read once
+        with os.scandir(self.skills_dir) as categories:
+            category_entries = [e for e in categories if not e.name.startswith('.') and e.is_dir()]
 
-            category = category_dir.name
+        for category_entry in category_entries:
+            category = category_entry.name
 
-            for skill_dir in category_dir.iterdir():
-                if not skill_dir.is_dir():
-                    continue
+            with os.scandir(category_entry.path) as skill_entries:
+                skill_dirs = [(e.name, e.path) for e in skill_entries if e.is_dir()]
 
-                skill_md = skill_dir / "SKILL.md"
-                metadata_file = skill_dir / "metadata.json"
-
-                if not skill_md.exists():
+            for dir_name, skill_path in skill_dirs:
+                if not os.path.exists(os.path.join(skill_path, "SKILL.md")):
                     continue
+                self.skill_count += 1
 
-                dir_name = skill_dir.name
+                # Load metadata
+                try:
+                    with open(os.path.join(skill_path, "metadata.json"), "rb") as f:
+                        metadata = load_json(f.read())
+                except Exception:
+                    metadata = None
 
                 # Extract base name (remove repo suffix if present)
                 # e.g., "doc-sync-owner-repo" -> "doc-sync"
-                base_name = self._extract_base_name(dir_name, metadata_file)
-
-                # Load metadata
-                metadata = {}
-                if metadata_file.exists():
-                    try:
-                        metadata = json.loads(metadata_file.read_text())
-                    except Exception:
-                        pass
+                base_name = self._extract_base_name(dir_name, metadata)
+                metadata = metadata or {}
 
                 self.registry[category][base_name][dir_name] = {
                     "repo": metadata.get("repo", ""),
                     "stars": metadata.get("stars", 0),
-                    "path": str(skill_dir),
+                    "path": skill_path,
                 }
 
         logger.info(f"Scanned existing skills: {sum(len(names) for names in self.registry.values())} unique names")
 
-    def _extract_base_name(self, dir_name: str, metadata_file: Path) -> str:
-        """Extract base name from directory name."""
-        if metadata_file.exists():
-            try:
-                metadata = json.loads(metadata_file.read_text())
-                if metadata.get("name"):
-                    return normalize_name(metadata["name"])
-                repo = metadata.get("repo", "")
-                suffix = get_repo_suffix(repo)
-                if suffix and dir_name.endswith(f"-{suffix}"):
-                    return dir_name[: -(len(suffix) + 1)]
-            except Exception:
-                pass
+    def _extract_base_name(self, dir_name: str, metadata: Optional[dict]) -> str:
+        """Extract base name from directory name and its metadata.json contents."""
+        if not isinstance(metadata, dict):
+            return dir_name
+
+        name = metadata.get("name")
+        if name and isinstance(name, str):
+            return normalize_name(name)
+        repo = metadata.get("repo")
+        suffix = get_repo_suffix(repo) if isinstance(repo, str) else ""
+        if suffix and dir_name.endswith(f"-{suffix}"):
+            return dir_name[: -(len(suffix) + 1)]
 
         return dir_name
 
-    def get_dir_name(self, name: str, repo: str, category: str, stars: int) -> str:
+    async def get_dir_name(self, name: str, repo: str, category: str, stars: int) -> str:
         """
         Determine directory name for a skill, handling conflicts.
 
@@ -173,8 +234,20 @@ class SkillRegistry:
                 new_dir_name = f"{base_name}-{existing_suffix}"
                 new_path = old_path.parent / new_dir_name
 
+                write = self.writes.get(old_path)
+                if write is not None:
+                    # Let the queued write land before moving its dir, then
+                    # decide again: other downloads may have moved on meanwhile
+                    await asyncio.wait([write])
+                    return await self.get_dir_name(name, repo, category, stars)
+
                 if old_path.exists() and not new_path.exists():
                     old_path.rename(new_path)
+                    self.dirs.moved(old_path, new_path)
+                    if old_path in self.claimed_dirs:
+                        # The claim follows the dir; the base name is free again
+                        self.claimed_dirs.discard(old_path)
+                        self.claimed_dirs.add(new_path)
                     logger.info(f"Renamed {base_name} -> {new_dir_name} (priority override)")
 
                     # Update registry
@@ -188,6 +261,18 @@ class SkillRegistry:
         suffix = get_repo_suffix(repo) or short_hash(repo or base_name)
         return f"{base_name}-{suffix}"
 
+    def track_write(self, skill_dir: Path, write: asyncio.Future) -> None:
+        """Record skill_dir's pending write; a priority rename waits for it."""
+        self.writes[skill_dir] = write
+
+        def done(future):
+            if self.writes.get(skill_dir) is future:
+                del self.writes[skill_dir]
+            if not future.cancelled():
+                future.exception()  # Raised to the awaiting caller or via pending instead
+
+        write.add_done_callback(done)
+
     def register(self, name: str, repo: str, category: str, stars: int, dir_name: str, path: Path):
         """Register a downloaded skill."""
         base_name = normalize_name(name)
@@ -198,49 +283,255 @@ class SkillRegistry:
             "stars": stars,
             "path": str(path),
         }
+        self.skill_count += 1
+
+
+class PatternStats:
+    """
+    Count which URL templates find skills and try the best ones first.
+
+    Branches are ordered by hits, and so are the named locations. The
+    unnamed ones (a repo-level SKILL.md) keep their place, so they are
+    never tried ahead of a skill-specific path. Counts persist between runs.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.hits = Counter()
+        try:
+            self.hits.update(load_json(path.read_bytes()))
+        except (OSError, ValueError):
+            pass
+        self.templates = URL_TEMPLATES
+        self.reorder()
+
+    def record(self, url: str, repo: str, skill_name: str):
+        for template in self.templates:
+            if template.format(repo=repo, name=skill_name) == url:
+                self.hits[template] += 1
+                return
+
+    def reorder(self):
+        hits = self.hits
+
+        def location_hits(location):
+            return sum(hits[_url_template(branch, location)] for branch in BRANCHES)
+
+        def branch_hits(branch):
+            return sum(hits[_url_template(branch, location)] for location in SKILL_LOCATIONS)
+
+        named = iter(sorted((loc for loc in SKILL_LOCATIONS if "{name}" in loc), key=location_hits, reverse=True))
+        locations = [next(named) if "{name}" in loc else loc for loc in SKILL_LOCATIONS]
+        branches = sorted(BRANCHES, key=branch_hits, reverse=True)
+        self.templates = tuple(_url_template(branch, location) for branch in branches for location in locations)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_bytes(dump_json(dict(self.hits), indent=True))
+
+
+class RepoTreeCache:
+    """
+    SKILL.md paths per repo from a single recursive git tree lookup.
+
+    Concurrent lookups for the same repo share one request. Once the API
+    rate-limits us, lookups stop and callers fall back to URL patterns.
+    With a cache_path, answers are kept on disk for TREE_CACHE_TTL so
+    repeat runs skip the API for repos they have already seen; refresh()
+    re-checks one of those against the live tree.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        concurrency: int = API_CONCURRENT,
+        cache_path: Optional[Path] = None,
+    ):
+        self.session = session  # API traffic only, pooled apart from raw fetches
+        self._lookups: Dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.disabled = False
+        self.cache_path = cache_path
+        # {repo: {"paths": [...], "truncated": bool, "ts": fetched at}}
+        self._stored: Dict[str, dict] = {}
+        self._from_disk: Set[str] = set()  # Repos whose current answer is a stored one
+        self._dirty = False
+        if cache_path:
+            try:
+                stored = load_json(cache_path.read_bytes())
+            except (OSError, ValueError):
+                stored = {}
+            now = time.time()
+            self._stored = {
+                repo: entry for repo, entry in stored.items() if now - entry.get("ts", 0) < TREE_CACHE_TTL
+            }
 
-
-def get_url_patterns(repo: str, skill_name: str, skill_path: str = "") -> List[str]:
+    async def get(self, repo: str) -> Optional[Tuple[Dict[str, str], bool]]:
+        """Return ({lowercased path: path}, truncated), or None if the tree is unavailable."""
+        task = self._lookups.get(repo)
+        if task is None:
+            task = self._lookups[repo] = asyncio.ensure_future(self._fetch(repo))
+        return await task
+
+    async def refresh(self, repo: str) -> Optional[Tuple[Dict[str, str], bool]]:
+        """Like get(), but an answer from the disk cache is fetched again (once)."""
+        if repo in self._from_disk:
+            self._from_disk.discard(repo)
+            self._lookups[repo] = asyncio.ensure_future(self._fetch(repo, use_stored=False))
+        return await self.get(repo)
+
+    async def _fetch(self, repo: str, use_stored: bool = True):
+        entry = self._stored.get(repo) if use_stored else None
+        if entry is not None:
+            self._from_disk.add(repo)
+            return {path.lower(): path for path in entry["paths"]}, entry["truncated"]
+        if self.disabled:
+            return None
+        url = f"{GITHUB_API_BASE}/repos/{repo}/git/trees/HEAD?recursive=1"
+        async with self._semaphore:
+            await API_LIMITER.wait()
+            try:
+                async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=API_TIMEOUT)) as resp:
+                    if resp.status in (403, 429):
+                        if not self.disabled:
+                            self.disabled = True
+                            logger.warning("GitHub API rate limited, falling back to URL patterns")
+                        return None
+                    if resp.status in (404, 409):
+                        # Missing, private or empty repo: nothing to download
+                        self._store(repo, {}, False)
+                        return {}, False
+                    if resp.status != 200:
+                        return None
+                    tree = load_json(await resp.read())
+            except Exception:
+                return None
+
+        paths = {}
+        for entry in tree.get("tree", ()):
+            path = entry.get("path", "")
+            if entry.get("type") == "blob" and (path == "SKILL.md" or path.endswith("/SKILL.md")):
+                paths[path.lower()] = path
+        truncated = bool(tree.get("truncated"))
+        if truncated:
+            # Past GitHub's tree size cap: list the usual skill directories
+            # so their skills still resolve to a single URL
+            for prefix in CONTENTS_PREFIXES:
+                for entry in await self._list_dir(repo, prefix):
+                    if entry.get("type") == "dir":
+                        path = f"{prefix}/{entry.get('name')}/SKILL.md"
+                        paths.setdefault(path.lower(), path)
+        self._store(repo, paths, truncated)
+        return paths, truncated
+
+    async def _list_dir(self, repo: str, path: str) -> list:
+        url = f"{GITHUB_API_BASE}/repos/{repo}/contents/{path}"
+        async with self._semaphore:
+            await API_LIMITER.wait()
+            try:
+                async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=API_TIMEOUT)) as resp:
+                    if resp.status != 200:
+                        return []
+                    listing = load_json(await resp.read())
+            except Exception:
+                return []
+        return listing if isinstance(listing, list) else []
+
+    def _store(self, repo: str, paths: Dict[str, str], truncated: bool):
+        if self.cache_path:
+            self._stored[repo] = {"paths": list(paths.values()), "truncated": truncated, "ts": time.time()}
+            self._dirty = True
+
+    def save(self):
+        if self.cache_path and self._dirty:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_path.write_bytes(dump_json(self._stored))
+            self._dirty = False
+
+
+def _explicit_location(skill_path: str) -> str:
+    return skill_path if skill_path.endswith("SKILL.md") else f"{skill_path}/SKILL.md"
+
+
+def find_skill_in_tree(paths: Dict[str, str], skill_name: str, skill_path: str = "") -> Optional[str]:
+    """
+    Resolve a skill against a repo's SKILL.md paths, case-insensitively.
+
+    Tries the explicit path and the named SKILL_LOCATIONS, then the
+    shortest path ending in {skill_name}/SKILL.md anywhere in the repo, and
+    only then the unnamed locations such as a root SKILL.md.
+    """
+    candidates = [_explicit_location(skill_path)] if skill_path else []
+    candidates.extend(location.format(name=skill_name) for location in SKILL_LOCATIONS if "{name}" in location)
+    for candidate in candidates:
+        found = paths.get(candidate.lower())
+        if found:
+            return found
+
+    suffix = f"/{skill_name.lower()}/skill.md"
+    matches = [path for lowered, path in paths.items() if lowered.endswith(suffix)]
+    if matches:
+        return min(matches, key=lambda p: (len(p), p))
+
+    skip = _implausible_locations(_explicit_location(skill_path)) if skill_path else set()
+    for location in SKILL_LOCATIONS:
+        if "{name}" not in location and location not in skip and location.lower() in paths:
+            return paths[location.lower()]
+    return None
+
+
+def _implausible_locations(location: str) -> Set[str]:
+    """SKILL_LOCATIONS an explicit SKILL.md location rules out."""
+    if location == "SKILL.md":
+        return set()
+    # The skill has its own directory, so repo-level SKILL.md files are
+    # some other skill
+    skip = {loc for loc in SKILL_LOCATIONS if "{name}" not in loc}
+    if location.count("/") > 1:
+        # Nested deeper than a top-level {name}/ directory
+        skip.add("{name}/SKILL.md")
+    return skip
+
+
+def get_url_patterns(
+    repo: str, skill_name: str, skill_path: str = "", templates: Tuple[str, ...] = URL_TEMPLATES
+) -> List[str]:
     """Generate URL patterns to try for downloading SKILL.md."""
-    patterns = []
-    branches = ["main", "master"]
-
     # If explicit path provided, try it first
     if skill_path:
-        for branch in branches:
-            if skill_path.endswith("SKILL.md"):
-                patterns.append(f"{GITHUB_RAW_BASE}/{repo}/{branch}/{skill_path}")
-            else:
-                patterns.append(f"{GITHUB_RAW_BASE}/{repo}/{branch}/{skill_path}/SKILL.md")
-
-    for branch in branches:
-        # Standard Claude Code locations
-        patterns.extend([
-            f"{GITHUB_RAW_BASE}/{repo}/{branch}/.claude/skills/{skill_name}/SKILL.md",
-            f"{GITHUB_RAW_BASE}/{repo}/{branch}/.claude/{skill_name}/SKILL.md",
-            f"{GITHUB_RAW_BASE}/{repo}/{branch}/.claude/SKILL.md",
-            f"{GITHUB_RAW_BASE}/{repo}/{branch}/skills/{skill_name}/SKILL.md",
-            f"{GITHUB_RAW_BASE}/{repo}/{branch}/{skill_name}/SKILL.md",
-            f"{GITHUB_RAW_BASE}/{repo}/{branch}/SKILL.md",
-        ])
-
-    # Remove duplicates while preserving order
-    seen = set()
-    return [p for p in patterns if not (p in seen or seen.add(p))]
+        location = _explicit_location(skill_path)
+        skip = _implausible_locations(location)
+        patterns = [
+            template.format(repo=repo, name=skill_name)
+            for template in templates
+            if TEMPLATE_LOCATIONS[template] not in skip
+        ]
+        explicit = [f"{GITHUB_RAW_BASE}/{repo}/{branch}/{location}" for branch in BRANCHES]
+        # The explicit path may repeat one of the standard locations
+        return list(dict.fromkeys(explicit + patterns))
+
+    return [template.format(repo=repo, name=skill_name) for template in templates]
 
 
 async def fetch_url(session: aiohttp.ClientSession, url: str, semaphore: asyncio.Semaphore) -> Tuple[Optional[str], int]:
-    """Fetch URL with status code."""
+    """Fetch a SKILL.md URL with status code; content that isn't a skill comes back as None."""
     async with semaphore:
         for attempt in range(RETRY_ATTEMPTS):
+            await RAW_LIMITER.wait()
             try:
                 async with session.get(url, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as resp:
                     if resp.status == 200:
-                        return await resp.text(), 200
+                        # Validate the head before pulling the rest of a wrong file
+                        head = await read_head(resp, SKILL_HEAD_BYTES)
+                        if not is_valid_skill_content(head):
+                            return None, 200
+                        return (head + await resp.content.read()).decode(resp.charset or "utf-8"), 200
                     elif resp.status == 404:
                         return None, 404
                     elif resp.status in (403, 429):
-                        await asyncio.sleep(2 ** attempt)
+                        # Hold back every raw request, not just this one, for
+                        # as long as GitHub asks (or 2**attempt s)
+                        RAW_LIMITER.pause(retry_after(resp.headers) or 2 ** attempt)
                         continue
                     return None, resp.status
             except Exception:
@@ -249,18 +540,40 @@ async def fetch_url(session: aiohttp.ClientSession, url: str, semaphore: asyncio
         return None, -1
 
 
-def is_valid_skill_content(content: str) -> bool:
-    """Validate that content is a proper SKILL.md file."""
-    if not content or len(content) < 50:
+def clean_repo(repo: str) -> str:
+    """owner/repo from a repo field that may be a GitHub URL or tree link."""
+    repo = repo.split("/tree/")[0]
+    if repo.startswith("https://github.com/"):
+        repo = repo.replace("https://github.com/", "")
+    return repo.rstrip("/")
+
+
+async def probe_url(session: aiohttp.ClientSession, url: str, semaphore: asyncio.Semaphore) -> int:
+    """HEAD status of a URL, or -1 on error."""
+    async with semaphore:
+        await RAW_LIMITER.wait()
+        try:
+            async with session.head(url, allow_redirects=False, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as resp:
+                if resp.status in (403, 429):
+                    RAW_LIMITER.pause(retry_after(resp.headers) or 1)
+                return resp.status
+        except Exception:
+            return -1
+
+
+def is_valid_skill_content(raw: bytes) -> bool:
+    """Validate that a response body (or its head) is a proper SKILL.md file."""
+    if len(raw) < 50:
         return False
 
-    indicators = [
-        content.strip().startswith("---"),
-        "description:" in content[:500].lower(),
-        "# " in content[:200],
-        "skill" in content[:500].lower(),
-    ]
-    return any(indicators)
+    # Cheapest signals first; no decoding needed
+    head = raw[:500].lower()
+    return (
+        raw.lstrip().startswith(b"---")
+        or b"description:" in head
+        or b"# " in raw[:200]
+        or b"skill" in head
+    )
 
 
 async def download_skill(
@@ -270,8 +583,22 @@ async def download_skill(
     registry: SkillRegistry,
     semaphore: asyncio.Semaphore,
     stats: dict,
+    trees: Optional[RepoTreeCache] = None,
+    pattern_stats: Optional[PatternStats] = None,
+    writer: Optional[ThreadPoolExecutor] = None,
+    pending: Optional[list] = None,
 ) -> bool:
-    """Download a single skill with conflict resolution."""
+    """
+    Download a single skill with conflict resolution.
+
+    A skill with an explicit path is fetched from there first. Otherwise,
+    with a tree cache, the repo's SKILL.md paths decide the one URL to
+    fetch; guessed URL patterns are the fallback when no tree is available.
+
+    With a writer, the files are written on that pool without waiting and
+    the future is appended to pending; call .result() on each to surface
+    write errors.
+    """
 
     name = skill.get("name", "")
     repo = skill.get("repo", "")
@@ -283,83 +610,143 @@ async def download_skill(
         stats["skipped"] += 1
         return False
 
-    # Clean repo path
-    repo = repo.split("/tree/")[0]
-    if repo.startswith("https://github.com/"):
-        repo = repo.replace("https://github.com/", "")
-    repo = repo.rstrip("/")
+    repo = clean_repo(repo)
 
     # Get directory name (handles conflicts)
+    skill_name = normalize_name(name)
     category_normalized = normalize_name(category) or "other"
-    dir_name = registry.get_dir_name(name, repo, category_normalized, stars)
+    dir_name = await registry.get_dir_name(name, repo, category_normalized, stars)
 
     key = build_skill_key(repo, path, name=name, category=category_normalized)
-    case_safe_dir = ensure_unique_dir(skills_dir / category_normalized, dir_name, key, repo=repo)
+    case_safe_dir = registry.dirs.ensure_unique_dir(skills_dir / category_normalized, dir_name, key, repo=repo)
 
     # Target path (case-safe)
     dir_name = case_safe_dir.name
     skill_dir = case_safe_dir
     skill_file = skill_dir / "SKILL.md"
 
-    # Already exists?
-    if skill_file.exists():
+    # Already exists, or being downloaded by another task? The claim is
+    # taken before the first await, so a write still in flight counts too
+    if skill_dir in registry.claimed_dirs or skill_file.exists():
         stats["skipped"] += 1
         return False
+    registry.claimed_dirs.add(skill_dir)
 
     # Try to download
-    patterns = get_url_patterns(repo, normalize_name(name), path)
-
-    for url in patterns[:8]:
+    content = None
+    missing: Set[str] = set()  # Guesses already known to 404
+    if path:
+        # The exact location first: one raw request, where the tree lookup
+        # is an API call whose payload grows with the repo
+        location = _explicit_location(path)
+        url = f"{GITHUB_RAW_BASE}/{repo}/HEAD/{location}"
         content, status = await fetch_url(session, url, semaphore)
-
-        if content and is_valid_skill_content(content):
-            # Extract github_path from URL
-            github_path = ""
-            try:
-                url_parts = url.replace(GITHUB_RAW_BASE + "/", "").split("/")
-                if len(url_parts) > 3:
-                    github_path = "/".join(url_parts[3:])
-                    if github_path.endswith("/SKILL.md"):
-                        github_path = github_path[:-9]
-                    elif github_path == "SKILL.md":
-                        github_path = ""
-            except Exception:
-                pass
-
-            # Create directory and save
-            skill_dir.mkdir(parents=True, exist_ok=True)
-            skill_file.write_text(content, encoding="utf-8")
-
-            # Save metadata
-            metadata = {
-                "name": name,
-                "description": skill.get("description", "")[:200],
-                "repo": repo,
-                "category": category,
-                "tags": skill.get("tags", []),
-                "stars": stars,
-                "source": skill.get("source", ""),
-                "github_path": github_path,
-                "dir_name": dir_name,
-                "downloaded_at": datetime.utcnow().isoformat() + "Z",
-            }
-            (skill_dir / "metadata.json").write_text(
-                json.dumps(metadata, indent=2, ensure_ascii=False),
-                encoding="utf-8"
-            )
-
-            # Register
-            registry.register(name, repo, category_normalized, stars, dir_name, skill_dir)
-
-            stats["downloaded"] += 1
-            return True
-
         if status == 403:
             stats["rate_limited"] += 1
+            registry.claimed_dirs.discard(skill_dir)
+            return False
+        if status == 404:
+            # HEAD is the default branch; the same path on main/master
+            # would be the same miss again
+            missing = {f"{GITHUB_RAW_BASE}/{repo}/{branch}/{location}" for branch in BRANCHES}
+
+    if not content:
+        patterns = None
+        tree = await trees.get(repo) if trees else None
+        found = None
+        if tree is not None:
+            found = find_skill_in_tree(tree[0], skill_name, path)
+            if not found and not tree[1]:
+                # A tree from the disk cache may predate the skill; check
+                # the live one before giving up
+                tree = await trees.refresh(repo)
+                if tree is not None:
+                    found = find_skill_in_tree(tree[0], skill_name, path)
+        if found:
+            patterns = [f"{GITHUB_RAW_BASE}/{repo}/HEAD/{found}"]
+        elif tree is not None and not tree[1]:
+            # The full tree has no such SKILL.md; skip the guaranteed 404s
+            stats["not_found"] += 1
+            registry.claimed_dirs.discard(skill_dir)
             return False
+        guessed = patterns is None
+        if guessed:
+            templates = pattern_stats.templates if pattern_stats else URL_TEMPLATES
+            patterns = get_url_patterns(repo, skill_name, path, templates)
+            known_branch = REPO_BRANCH.get(repo)
+            if known_branch:
+                # Siblings were found on this branch; try it first
+                prefix = f"{GITHUB_RAW_BASE}/{repo}/{known_branch}/"
+                patterns.sort(key=lambda url: not url.startswith(prefix))
+            patterns = [url for url in patterns if url not in MISSING_URLS and url not in missing][:8]
+            # Probe the guesses at once with HEAD; only those that may exist
+            # are fetched, still in priority order
+            statuses = await asyncio.gather(*(probe_url(session, url, semaphore) for url in patterns))
+            shared = {template.format(repo=repo) for template in REPO_LEVEL_TEMPLATES}
+            MISSING_URLS.update(url for url, status in zip(patterns, statuses, strict=True) if status == 404 and url in shared)
+            patterns = [url for url, status in zip(patterns, statuses, strict=True) if status != 404]
+
+        for url in patterns[:8]:
+            content, status = await fetch_url(session, url, semaphore)
+            if content:
+                if guessed:
+                    REPO_BRANCH[repo] = url[len(GITHUB_RAW_BASE) + len(repo) + 2:].split("/", 1)[0]
+                    if pattern_stats:
+                        pattern_stats.record(url, repo, skill_name)
+                break
+            if status == 403:
+                stats["rate_limited"] += 1
+                registry.claimed_dirs.discard(skill_dir)
+                return False
+
+    if not content:
+        stats["not_found"] += 1
+        registry.claimed_dirs.discard(skill_dir)
+        return False
+
+    # Extract github_path from URL
+    github_path = ""
+    try:
+        url_parts = url.replace(GITHUB_RAW_BASE + "/", "").split("/")
+        if len(url_parts) > 3:
+            github_path = "/".join(url_parts[3:])
+            if github_path.endswith("/SKILL.md"):
+                github_path = github_path[:-9]
+            elif github_path == "SKILL.md":
+                github_path = ""
+    except Exception:
+        pass
+
+    # Claim the directory before yielding so concurrent downloads
+    # see it, then write the files off the event loop
+    skill_dir.mkdir(parents=True, exist_ok=True)
+    metadata = {
+        "name": name,
+        "description": skill.get("description", "")[:200],
+        "repo": repo,
+        "category": category,
+        "tags": skill.get("tags", []),
+        "stars": stars,
+        "source": skill.get("source", ""),
+        "github_path": github_path,
+        "dir_name": dir_name,
+        "downloaded_at": datetime.utcnow().isoformat() + "Z",
+    }
+    registry.dirs.add(skill_dir, metadata)
+    registry.register(name, repo, category_normalized, stars, dir_name, skill_dir)
 
-    stats["not_found"] += 1
-    return False
+    if writer is None:
+        write = asyncio.ensure_future(asyncio.to_thread(write_skill_files, skill_dir, content, metadata))
+    else:
+        future = writer.submit(write_skill_files, skill_dir, content, metadata)
+        pending.append(future)
+        write = asyncio.wrap_future(future)
+    registry.track_write(skill_dir, write)
+    if writer is None:
+        await write
+
+    stats["downloaded"] += 1
+    return True
 
 
 async def main():
@@ -368,39 +755,46 @@ async def main():
     registry_dir = script_dir.parent
     skills_dir = registry_dir / "skills"
 
-    # Load skills from sources
-    skills = []
+    # Load skills from sources, deduplicating by repo+name as each file is
+    # read rather than collecting everything first
+    seen = set()
+    add_seen = seen.add
+    unique_skills = []
+
+    def add_skills(data):
+        for s in data.get("skills", []):
+            key = (s.get('repo', ''), s.get('name', ''))
+            if key not in seen:
+                add_seen(key)
+                unique_skills.append(s)
 
     # Load from registry.json
     registry_file = registry_dir / "registry.json"
     if registry_file.exists():
-        with open(registry_file, 'r') as f:
-            data = json.load(f)
-            skills.extend(data.get("skills", []))
+        add_skills(load_json(registry_file.read_bytes()))
 
     # Load from sources
     sources_dir = registry_dir / "sources"
     if sources_dir.exists():
         for source_file in sources_dir.glob("*.json"):
+            if source_file.name.startswith("."):
+                continue  # Hidden files (old caches) aren't skill sources
             try:
-                with open(source_file, 'r') as f:
-                    data = json.load(f)
-                    skills.extend(data.get("skills", []))
+                add_skills(load_json(source_file.read_bytes()))
             except Exception as e:
                 logger.warning(f"Failed to load {source_file}: {e}")
 
-    # Deduplicate by repo+name
-    seen = set()
-    unique_skills = []
-    for s in skills:
-        key = f"{s.get('repo', '')}:{s.get('name', '')}"
-        if key not in seen:
-            seen.add(key)
-            unique_skills.append(s)
-
     # Sort by stars (download high-star skills first for priority)
     unique_skills.sort(key=lambda x: x.get("stars", 0), reverse=True)
 
+    # Keep each repo's skills together, ordered by the repo's best star
+    # count, so siblings are in flight together, share the repo's tree
+    # lookup and reuse its warm connections
+    by_repo = defaultdict(list)
+    for skill in unique_skills:
+        by_repo[clean_repo(skill.get("repo", ""))].append(skill)
+    unique_skills = [skill for group in by_repo.values() for skill in group]
+
     logger.info(f"Total skills to process: {len(unique_skills)}")
 
     # Initialize registry
@@ -422,34 +816,77 @@ async def main():
 
     # Download
     semaphore = asyncio.Semaphore(MAX_CONCURRENT)
-    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT * 2)
+    writer = ThreadPoolExecutor(max_workers=WRITE_WORKERS)
+    pending = []
+    pattern_stats = PatternStats(registry_dir / ".download_cache" / "pattern_stats.json")
+    # Keep-alive pools for the whole run; connections (and their TLS
+    # sessions) are reused instead of re-handshaking. Raw and API traffic
+    # get separate pools so slow or throttled tree lookups never hold
+    # connections the raw downloads need
+    connector = aiohttp.TCPConnector(
+        limit=MAX_CONCURRENT * 2,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=300,
+        enable_cleanup_closed=True,
+    )
+    api_connector = aiohttp.TCPConnector(
+        limit=API_CONCURRENT,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=300,
+        enable_cleanup_closed=True,
+    )
 
     start_time = time.time()
 
-    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
-        for i in range(0, len(unique_skills), BATCH_SIZE):
-            batch = unique_skills[i:i + BATCH_SIZE]
-            batch_num = i // BATCH_SIZE + 1
-            total_batches = (len(unique_skills) + BATCH_SIZE - 1) // BATCH_SIZE
-
-            logger.info(f"Batch {batch_num}/{total_batches} ({len(batch)} skills)")
-
-            tasks = [
-                download_skill(session, skill, skills_dir, registry, semaphore, stats)
-                for skill in batch
-            ]
-
-            await asyncio.gather(*tasks, return_exceptions=True)
-
-            elapsed = time.time() - start_time
-            rate = (stats["downloaded"] + stats["skipped"]) / elapsed if elapsed > 0 else 0
-
-            logger.info(
-                f"Progress: ✅ {stats['downloaded']} | ⏭️ {stats['skipped']} | "
-                f"❌ {stats['not_found']} | ⚡ {rate:.1f}/s"
-            )
-
-            await asyncio.sleep(0.3)
+    async with (
+        aiohttp.ClientSession(connector=connector, headers=headers) as session,
+        aiohttp.ClientSession(connector=api_connector, headers=headers) as api_session,
+    ):
+        trees = RepoTreeCache(api_session, cache_path=registry_dir / ".download_cache" / "repo_trees.json")
+        # Bounded queue drained by a fixed set of workers: memory stays flat
+        # regardless of input size, and a slow skill never holds up the rest
+        queue = asyncio.Queue(maxsize=MAX_CONCURRENT * 4)
+        processed = 0
+
+        async def worker():
+            nonlocal processed
+            while True:
+                skill = await queue.get()
+                try:
+                    await download_skill(
+                        session, skill, skills_dir, registry, semaphore, stats, trees, pattern_stats, writer, pending
+                    )
+                except Exception as e:
+                    logger.debug(f"Failed {skill.get('repo')}/{skill.get('name')}: {e}")
+                finally:
+                    queue.task_done()
+
+                processed += 1
+                if processed % PROGRESS_EVERY == 0:
+                    pattern_stats.reorder()
+                    elapsed = time.time() - start_time
+                    rate = (stats["downloaded"] + stats["skipped"]) / elapsed if elapsed > 0 else 0
+                    logger.info(
+                        f"Progress {processed}/{len(unique_skills)}: "
+                        f"✅ {stats['downloaded']} | ⏭️ {stats['skipped']} | "
+                        f"❌ {stats['not_found']} | ⚡ {rate:.1f}/s"
+                    )
+
+        workers = [asyncio.create_task(worker()) for _ in range(MAX_CONCURRENT)]
+        try:
+            for skill in unique_skills:
+                await queue.put(skill)
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            # Keep what this run learned even if it was interrupted
+            trees.save()
+            pattern_stats.save()
+            writer.shutdown(wait=True)
+    for future in pending:
+        future.result()
 
     # Summary
     elapsed = time.time() - start_time
@@ -464,9 +901,8 @@ async def main():
     print(f"  Time:          {elapsed:.1f}s")
     print("=" * 60)
 
-    # Count final skills
-    total = sum(1 for _ in skills_dir.rglob("SKILL.md"))
-    print(f"  Total skills:  {total}")
+    # Skills found by the startup scan plus this run's downloads
+    print(f"  Total skills:  {registry.skill_count}")
 
 
 if __name__ == "__main__":
@@ -9,7 +9,6 @@ final naming.
 """
 
 import argparse
-import json
 import shutil
 from pathlib import Path
 
@@ -19,22 +18,23 @@ from utils import (
     normalize_repo,
     build_skill_key,
     short_hash,
+    iter_files_named,
+    load_json,
+    dump_json,
 )
 
 
 def load_metadata(skill_dir: Path) -> dict:
     meta_path = skill_dir / "metadata.json"
-    if not meta_path.exists():
-        return {}
     try:
-        return json.loads(meta_path.read_text(encoding="utf-8"))
-    except Exception:
+        return load_json(meta_path.read_bytes())
+    except Exception:  # Missing or unreadable metadata
         return {}
 
 
 def write_metadata(skill_dir: Path, meta: dict) -> None:
     meta_path = skill_dir / "metadata.json"
-    meta_path.write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+    meta_path.write_bytes(dump_json(meta, indent=True))
 
 
 def is_standard(rel_parts: tuple[str, ...]) -> bool:
@@ -56,7 +56,7 @@ def main() -> None:
         moves = []
         seen_dirs = set()
 
-        for skill_md in skills_dir.rglob("SKILL.md"):
+        for skill_md in map(Path, iter_files_named(skills_dir, "SKILL.md")):
             rel = skill_md.relative_to(skills_dir)
             if is_standard(rel.parts):
                 continue
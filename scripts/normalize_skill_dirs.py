@@ -13,7 +13,6 @@ Rules:
 """
 
 import argparse
-import json
 import shutil
 from collections import defaultdict
 from pathlib import Path
@@ -26,6 +25,8 @@ from utils import (
     get_repo_suffix,
     short_hash,
     normalize_repo,
+    load_json,
+    dump_json,
 )
 
 OFFICIAL_REPOS = {"anthropics/skills", "anthropics/claude-code"}
@@ -33,11 +34,9 @@ OFFICIAL_REPOS = {"anthropics/skills", "anthropics/claude-code"}
 
 def load_metadata(skill_dir: Path) -> dict:
     meta_path = skill_dir / "metadata.json"
-    if not meta_path.exists():
-        return {}
     try:
-        return json.loads(meta_path.read_text(encoding="utf-8"))
-    except Exception:
+        return load_json(meta_path.read_bytes())
+    except Exception:  # Missing or unreadable metadata
         return {}
 
 
@@ -204,7 +203,7 @@ def apply_plan(plan: Dict[str, List[dict]], dry_run: bool = True) -> None:
             if not meta.get("name"):
                 meta["name"] = e["base_name"]
             meta_path = e["dir"] / "metadata.json"
-            meta_path.write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+            meta_path.write_bytes(dump_json(meta, indent=True))
 
     print("Normalization complete.")
 
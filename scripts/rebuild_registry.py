@@ -7,16 +7,20 @@ Scans all skills/*/SKILL.md files and rebuilds the registry index.
 
 import json
 import os
-import re
 import logging
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
-import yaml
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from utils import dump_json, iter_files_named, load_frontmatter, load_json, strip_inline_markdown
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+CATEGORY_WRITE_WORKERS = 8  # Category files are independent; overlap their writes
+
 
 def extract_frontmatter(content: str) -> dict:
     """Extract YAML frontmatter from SKILL.md."""
@@ -30,7 +34,7 @@ def extract_frontmatter(content: str) -> dict:
             return {}
 
         frontmatter = content[3:end_idx].strip()
-        data = yaml.safe_load(frontmatter)
+        data = load_frontmatter(frontmatter)
         return data if isinstance(data, dict) else {}
     except Exception:
         return {}
@@ -38,10 +42,13 @@ def extract_frontmatter(content: str) -> dict:
 
 def extract_description(content: str) -> str:
     """Extract description from content."""
-    # Try frontmatter first
-    fm = extract_frontmatter(content)
-    if fm.get("description"):
-        return fm["description"][:200]
+    # Try frontmatter first; most blocks have no description key, so probe
+    # the raw text before parsing
+    end_idx = content.find("---", 3)
+    if content.startswith("---") and end_idx > 0 and "description" in content[3:end_idx]:
+        fm = extract_frontmatter(content)
+        if fm.get("description"):
+            return fm["description"][:200]
 
     # Try first paragraph after frontmatter
     lines = content.split("\n")
@@ -57,9 +64,7 @@ def extract_description(content: str) -> str:
         if line.startswith("#"):
             continue
         if line and not line.startswith("```"):
-            # Clean markdown
-            line = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', line)
-            line = re.sub(r'[*_`]', '', line)
+            line = strip_inline_markdown(line)  # Clean markdown
             return line[:200]
 
     return ""
@@ -67,11 +72,10 @@ def extract_description(content: str) -> str:
 
 def safe_load_metadata(metadata_path: Path) -> dict:
     """Safely load metadata.json"""
-    if not metadata_path.exists():
-        return {}
     try:
-        with open(metadata_path, encoding='utf-8') as f:
-            return json.load(f)
+        return load_json(metadata_path.read_bytes())
+    except FileNotFoundError:
+        return {}
     except json.JSONDecodeError as e:
         logger.warning(f"JSON parse error in {metadata_path}: {e}")
         return {}
@@ -84,8 +88,7 @@ def safe_write_registry(registry_path: Path, registry: dict) -> bool:
     """Safely write registry.json with atomic operation"""
     temp_path = registry_path.with_suffix('.json.tmp')
     try:
-        with open(temp_path, "w", encoding="utf-8") as f:
-            json.dump(registry, f, indent=2, ensure_ascii=False)
+        temp_path.write_bytes(dump_json(registry, indent=True))
 
         # Backup original file
         if registry_path.exists():
@@ -119,7 +122,7 @@ def scan_skills(skills_dir: Path) -> list:
         logger.warning(f"Skills directory not found: {skills_dir}")
         return skills
 
-    for metadata_path in skills_dir.rglob("metadata.json"):
+    for metadata_path in map(Path, iter_files_named(skills_dir, "metadata.json")):
         skill_dir = metadata_path.parent
         skill_md = skill_dir / "SKILL.md"
         if not skill_md.exists():
@@ -192,6 +195,7 @@ def scan_skills(skills_dir: Path) -> list:
     return skills
 
 
+@lru_cache(maxsize=128)
 def sanitize_category(category: str) -> str:
     """Sanitize category name for use as filename."""
     # Replace / and other problematic characters with -
@@ -203,32 +207,34 @@ def build_category_indexes(skills: list, output_dir: Path):
     categories = defaultdict(list)
 
     for skill in skills:
-        cat = skill.get("category", "other")
         # Sanitize category for filename safety
-        safe_cat = sanitize_category(cat)
-        categories[safe_cat].append(skill)
+        categories[sanitize_category(skill.get("category", "other"))].append(skill)
 
     output_dir.mkdir(exist_ok=True)
 
-    for cat, cat_skills in categories.items():
-        cat_file = output_dir / f"{cat}.json"
+    updated_at = datetime.utcnow().isoformat() + "Z"
+    index_entries = []
+
+    def write_category(item):
+        cat, cat_skills = item
         cat_data = {
             "category": cat,
             "count": len(cat_skills),
-            "updated_at": datetime.utcnow().isoformat() + "Z",
+            "updated_at": updated_at,
             "skills": sorted(cat_skills, key=lambda x: (-x.get("stars", 0), x["name"])),
         }
-        with open(cat_file, "w", encoding="utf-8") as f:
-            json.dump(cat_data, f, indent=2, ensure_ascii=False)
-        print(f"  {cat}: {len(cat_skills)} skills")
+        (output_dir / f"{cat}.json").write_bytes(dump_json(cat_data, indent=True))
+        return cat, cat_data["count"]
+
+    with ThreadPoolExecutor(max_workers=CATEGORY_WRITE_WORKERS) as executor:
+        for cat, count in executor.map(write_category, sorted(categories.items())):
+            index_entries.append({"name": cat, "count": count})
+            print(f"  {cat}: {count} skills")
 
     # Index file
     index = {
-        "updated_at": datetime.utcnow().isoformat() + "Z",
-        "categories": [
-            {"name": cat, "count": len(skills)}
-            for cat, skills in sorted(categories.items())
-        ]
+        "updated_at": updated_at,
+        "categories": index_entries,
     }
     with open(output_dir / "index.json", "w", encoding="utf-8") as f:
         json.dump(index, f, indent=2)
@@ -266,6 +272,7 @@ if __name__ == "__main__":
         # Remove duplicates by repo:path (more accurate than name-only)
         # This prevents losing skills with same name but different sources
         seen = set()
+        add_seen = seen.add
         unique_skills = []
         duplicates_removed = 0
 
@@ -274,16 +281,14 @@ if __name__ == "__main__":
             repo = s.get("repo", "")
             path = s.get("path", "")
 
-            if repo and path:
-                key = f"{repo}:{path}"
-            elif repo:
-                key = repo
+            if repo:
+                key = (repo, path)
             else:
                 # Fallback to category:name for local skills without repo
-                key = f"{s.get('category', 'other')}:{s['name']}"
+                key = ("", s.get("category", "other"), s["name"])
 
             if key not in seen:
-                seen.add(key)
+                add_seen(key)
                 unique_skills.append(s)
             else:
                 duplicates_removed += 1
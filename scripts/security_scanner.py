@@ -13,6 +13,8 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 import jsonschema
 
+from utils import iter_files_named
+
 # Load schema
 SCHEMA_PATH = Path(__file__).parent.parent / "schema" / "skill.schema.json"
 
@@ -54,6 +56,9 @@ SENSITIVE_PATHS = [
     '/proc/', '/sys/', '$HOME/.env', '.env',
 ]
 
+# Directories never searched for SKILL.md files
+SKIP_DIRS = frozenset({'.git', 'node_modules', '.venv', '__pycache__'})
+
 
 class SecurityScanner:
     """Security scanner for SKILL.md files"""
@@ -142,13 +147,13 @@ class SecurityScanner:
         if not content.startswith('---'):
             return None
 
-        parts = content.split('---', 2)
-        if len(parts) < 3:
+        end = content.find('---', 3)
+        if end == -1:
             return None
 
         try:
             # Use safe_load to prevent YAML deserialization attacks
-            return yaml.safe_load(parts[1])
+            return yaml.safe_load(content[3:end])
         except yaml.YAMLError as e:
             self.issues.append({
                 'severity': 'error',
@@ -294,7 +299,8 @@ def scan_directory(skills_dir: Path, output_file: Path = None, quiet: bool = Fal
         'skills': []
     }
 
-    for skill_file in skills_dir.rglob('SKILL.md'):
+    for skill_path in iter_files_named(skills_dir, 'SKILL.md', prune=SKIP_DIRS.__contains__):
+        skill_file = Path(skill_path)
         results['total'] += 1
 
         is_safe, issues = scanner.scan_file(skill_file)
@@ -22,19 +22,22 @@ Environment:
 
 import argparse
 import asyncio
-import json
+import gzip
 import logging
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import Optional
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from crawler.skillsmp_sync import SkillsMPSync
-from scripts.utils import normalize_name, ensure_unique_dir, build_skill_key
+from scripts.utils import normalize_name, build_skill_key, dump_json, load_json, AsyncRateLimiter, SkillDirIndex, write_skill_files, read_head, retry_after
 
 
 def sanitize_category(category: str) -> str:
@@ -55,6 +58,105 @@ def skill_key(skill: dict) -> str:
     category = skill.get("category") or "other"
     return f"{category}:{name}"
 
+
+# Download manifest, one "key<TAB>dir" row per skill directory, kept in
+# .download_cache/ next to the skills directory (which is committed as
+# data). The tree is still listed on every run, but only dirs the manifest
+# doesn't know (written by other scripts, renamed, or new) or whose files
+# changed since it was written have their metadata.json parsed. Delete it
+# to re-read them all.
+MANIFEST_NAME = "skills_manifest.tsv"
+LEGACY_MANIFEST_NAME = ".manifest.tsv"  # Former location, inside the skills dir
+SCAN_EXCLUDE = {".git", ".github-skills", ".template", ".templates", ".attic"}
+SCAN_WORKERS = 8  # Threads walking category directories on a cold start
+
+
+def _dir_skill_key(dirpath: str, filenames: list) -> str:
+    if "metadata.json" not in filenames:
+        return ""
+    try:
+        meta = load_json(Path(dirpath, "metadata.json").read_bytes())
+    except Exception:
+        meta = {}
+    return skill_key(meta)
+
+
+def _changed_since(dirpath: str, filenames: list, since: float) -> bool:
+    for name in ("SKILL.md", "metadata.json"):
+        if name in filenames:
+            try:
+                if os.stat(os.path.join(dirpath, name)).st_mtime > since:
+                    return True
+            except OSError:
+                return True
+    return False
+
+
+def _known_key(known: dict, known_at: float, rel: str, dirpath: str, filenames: list) -> str:
+    key = known.get(rel)
+    if key and not _changed_since(dirpath, filenames, known_at):
+        return key
+    return _dir_skill_key(dirpath, filenames)
+
+
+def _scan_subtree(output_dir: Path, known: dict, known_at: float, top: str) -> dict:
+    entries = {}
+    for dirpath, dirnames, filenames in os.walk(top):
+        dirnames[:] = [d for d in dirnames if d not in SCAN_EXCLUDE]
+        if "SKILL.md" in filenames:
+            rel = os.path.relpath(dirpath, output_dir)
+            entries[rel] = _known_key(known, known_at, rel, dirpath, filenames)
+    return entries
+
+
+def scan_skill_dirs(output_dir: Path, known: Optional[dict] = None, known_at: float = 0.0) -> dict:
+    """
+    {dir relative to output_dir: skill_key} for every dir with a SKILL.md ("" without metadata).
+
+    Keys for dirs in `known` (the manifest, written at `known_at`) are
+    reused unless SKILL.md or metadata.json is newer; every other dir's
+    metadata.json is read. Each top-level (category) directory is walked on
+    its own thread; the stat and metadata reads overlap instead of running
+    one at a time.
+    """
+    known = known or {}
+    root = next(os.walk(output_dir), None)
+    if root is None:
+        return {}
+    _, dirnames, filenames = root
+
+    entries = {}
+    if "SKILL.md" in filenames:
+        entries["."] = _known_key(known, known_at, ".", str(output_dir), filenames)
+    tops = [os.path.join(output_dir, d) for d in dirnames if d not in SCAN_EXCLUDE]
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        # map() keeps the serial walk's order
+        for subtree in executor.map(partial(_scan_subtree, output_dir, known, known_at), tops):
+            entries.update(subtree)
+    return entries
+
+
+def read_manifest(manifest_path: Path):
+    """({dir: skill_key} rows, mtime) from the manifest; ({}, 0.0) without one."""
+    try:
+        known_at = manifest_path.stat().st_mtime
+        text = manifest_path.read_text(encoding="utf-8")
+    except OSError:
+        return {}, 0.0
+    entries = {}
+    for line in text.splitlines():
+        key, sep, rel = line.partition("\t")
+        if sep:
+            entries[rel] = key
+    return entries, known_at
+
+
+def write_manifest(manifest_path: Path, entries: dict) -> None:
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp.write_text("".join(f"{key}\t{rel}\n" for rel, key in entries.items()), encoding="utf-8")
+    os.replace(tmp, manifest_path)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -87,12 +189,15 @@ def build_unified_registry(sources_dir: Path, output_path: Path) -> int:
     logger.info("=" * 60)
 
     all_skills = []
+    sort_keys = []  # Parallel to all_skills: (-stars, lowercased name)
     seen = set()
+    add_seen = seen.add
 
     for source_file in sources_dir.glob("*.json"):
+        if source_file.name.startswith("."):
+            continue  # Hidden files (old caches) aren't skill sources
         logger.info(f"Loading {source_file.name}...")
-        with open(source_file) as f:
-            source = json.load(f)
+        source = load_json(source_file.read_bytes())
 
         source_name = source.get("name", source_file.stem)
 
@@ -101,12 +206,14 @@ def build_unified_registry(sources_dir: Path, output_path: Path) -> int:
             repo = skill.get("repo", "")
             name = skill.get("name", "")
             path = skill.get("path", "")
-            key = f"{repo}/{path}/{name}"
+            key = (repo, path, name)
 
             if key in seen:
                 continue
-            seen.add(key)
+            add_seen(key)
 
+            stars = skill.get("stars", 0)
+            sort_keys.append((-stars, name.lower()))
             all_skills.append({
                 "name": name,
                 "description": skill.get("description", ""),
@@ -114,13 +221,14 @@ def build_unified_registry(sources_dir: Path, output_path: Path) -> int:
                 "path": path,
                 "category": skill.get("category", "development"),
                 "tags": skill.get("tags", []),
-                "stars": skill.get("stars", 0),
+                "stars": stars,
                 "source": source_name,
                 "featured": skill.get("featured", False),
             })
 
     # Sort by stars (descending) then name
-    all_skills.sort(key=lambda x: (-x.get("stars", 0), x["name"].lower()))
+    order = sorted(range(len(all_skills)), key=sort_keys.__getitem__)
+    all_skills = [all_skills[i] for i in order]
 
     registry = {
         "version": "2.0.0",
@@ -129,8 +237,7 @@ def build_unified_registry(sources_dir: Path, output_path: Path) -> int:
         "skills": all_skills,
     }
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(registry, f, indent=2, ensure_ascii=False)
+    output_path.write_bytes(dump_json(registry, indent=True))
 
     logger.info(f"Built registry with {len(all_skills)} unique skills")
     return len(all_skills)
@@ -149,27 +256,29 @@ async def download_skills(registry_path: Path, output_dir: Path, github_token: s
     GITHUB_RAW_BASE = "https://raw.githubusercontent.com"
     MAX_CONCURRENT = 100
     TIMEOUT = 15
-    BATCH_SIZE = 300
+    PROGRESS_EVERY = 300  # Skills processed between progress log lines
+    KEEPALIVE_TIMEOUT = 75  # Seconds idle connections stay open
+    RAW_REQUESTS_PER_SECOND = 80  # Paced separately from the concurrency limit
+    HEAD_BYTES = 2048  # Bytes read to validate a candidate before the rest
 
     # Load registry
-    with open(registry_path) as f:
-        registry = json.load(f)
+    registry = load_json(registry_path.read_bytes())
 
     skills = registry.get("skills", [])
     logger.info(f"Total skills in registry: {len(skills)}")
 
-    # Check existing (across all categories)
-    exclude = {".git", ".github-skills", ".template", ".templates", ".attic"}
-    existing = set()
-    for dirpath, dirnames, filenames in os.walk(output_dir):
-        dirnames[:] = [d for d in dirnames if d not in exclude]
-        if "metadata.json" in filenames and "SKILL.md" in filenames:
-            meta_path = Path(dirpath) / "metadata.json"
-            try:
-                meta = json.loads(meta_path.read_text(encoding="utf-8"))
-            except Exception:
-                meta = {}
-            existing.add(skill_key(meta))
+    # Check existing (across all categories). The tree is listed every run,
+    # so dirs other scripts wrote or moved are seen; the manifest only
+    # spares re-reading metadata for dirs it already knows
+    manifest_path = output_dir.parent / ".download_cache" / MANIFEST_NAME
+    # The old in-tree copy would otherwise be committed with the skills
+    (output_dir / LEGACY_MANIFEST_NAME).unlink(missing_ok=True)
+    entries = scan_skill_dirs(output_dir, *read_manifest(manifest_path))
+    # Rewrite it reconciled: removed dirs dropped, new ones added
+    write_manifest(manifest_path, entries)
+    existing = {key for key in entries.values() if key}
+    on_disk = len(entries)  # SKILL.md dirs already present
+    new_dirs = 0  # Dirs created by this run; a download into an existing dir adds none
 
     logger.info(f"Already downloaded: {len(existing)}")
 
@@ -189,9 +298,19 @@ async def download_skills(registry_path: Path, output_dir: Path, github_token: s
         headers["Authorization"] = f"token {github_token}"
 
     semaphore = asyncio.Semaphore(MAX_CONCURRENT)
-    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT * 2)
+    raw_limiter = AsyncRateLimiter(RAW_REQUESTS_PER_SECOND)
+    dir_index = SkillDirIndex()  # Lists each category dir once, not per download
+    # One keep-alive pool for the whole run; connections (and their TLS
+    # sessions) are reused instead of re-handshaking
+    connector = aiohttp.TCPConnector(
+        limit=MAX_CONCURRENT * 2,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=300,
+        enable_cleanup_closed=True,
+    )
 
     async def try_download(session: aiohttp.ClientSession, skill: dict) -> bool:
+        nonlocal new_dirs
         name = skill["name"]
         # Normalize name to prevent case conflicts on macOS/Windows
         normalized_name = normalize_name(name)
@@ -223,35 +342,41 @@ async def download_skills(registry_path: Path, output_dir: Path, github_token: s
 
         async with semaphore:
             for url in patterns[:12]:
+                await raw_limiter.wait()
                 try:
                     async with session.get(url, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as resp:
                         if resp.status == 200:
-                            content = await resp.text()
-                            if content and len(content) > 50 and ("---" in content[:50] or "#" in content[:100]):
+                            # Check the raw head first; a non-skill file at {path}
+                            # is neither read in full nor decoded
+                            head = await read_head(resp, HEAD_BYTES)
+                            if len(head) > 50 and (b"---" in head[:50] or b"#" in head[:100]):
+                                content = (head + await resp.content.read()).decode(resp.charset or "utf-8")
                                 # Valid content - save under category with normalized name
                                 category = sanitize_category(skill.get("category", "other"))
-                                category_dir = output_dir / category
-                                category_dir.mkdir(parents=True, exist_ok=True)
                                 key = build_skill_key(repo, path, name=name, category=category)
-                                skill_dir = ensure_unique_dir(category_dir, normalized_name, key, repo=repo)
+                                skill_dir = dir_index.ensure_unique_dir(output_dir / category, normalized_name, key, repo=repo)
+                                if not skill_dir.exists():
+                                    new_dirs += 1
                                 skill_dir.mkdir(parents=True, exist_ok=True)
-                                (skill_dir / "SKILL.md").write_text(content, encoding="utf-8")
-                                (skill_dir / "metadata.json").write_text(
-                                    json.dumps({
-                                        "name": name,
-                                        "description": skill.get("description", ""),
-                                        "repo": repo,
-                                        "path": path,
-                                        "category": skill.get("category", ""),
-                                        "tags": skill.get("tags", []),
-                                        "stars": skill.get("stars", 0),
-                                        "source": skill.get("source", ""),
-                                        "dir_name": skill_dir.name,
-                                    }, indent=2, ensure_ascii=False),
-                                    encoding="utf-8"
-                                )
+                                metadata = {
+                                    "name": name,
+                                    "description": skill.get("description", ""),
+                                    "repo": repo,
+                                    "path": path,
+                                    "category": skill.get("category", ""),
+                                    "tags": skill.get("tags", []),
+                                    "stars": skill.get("stars", 0),
+                                    "source": skill.get("source", ""),
+                                    "dir_name": skill_dir.name,
+                                }
+                                # Claim the directory before yielding, then write off the loop
+                                dir_index.add(skill_dir, metadata)
+                                await asyncio.to_thread(write_skill_files, skill_dir, content, metadata)
+                                manifest.write(f"{skill_key(metadata)}\t{os.path.relpath(skill_dir, output_dir)}\n")
                                 return True
-                        elif resp.status == 403:
+                        elif resp.status in (403, 429):
+                            # Slow every later request down, not just this skill
+                            raw_limiter.pause(retry_after(resp.headers) or 1)
                             failures["rate_limited"].append(name)
                             return False
                 except asyncio.TimeoutError:
@@ -264,33 +389,49 @@ async def download_skills(registry_path: Path, output_dir: Path, github_token: s
 
     start_time = time.time()
 
-    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
-        for i in range(0, len(pending), BATCH_SIZE):
-            batch = pending[i:i + BATCH_SIZE]
-            batch_num = i // BATCH_SIZE + 1
-            total_batches = (len(pending) + BATCH_SIZE - 1) // BATCH_SIZE
-
-            tasks = [try_download(session, s) for s in batch]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for r in results:
-                if r is True:
-                    stats["downloaded"] += 1
-                else:
-                    stats["failed"] += 1
-
-            elapsed = time.time() - start_time
-            rate = stats["downloaded"] / elapsed if elapsed > 0 else 0
-
-            logger.info(
-                f"Batch {batch_num}/{total_batches}: "
-                f"✅ {stats['downloaded']} | ❌ {stats['failed']} | ⚡ {rate:.1f}/s"
-            )
-
-            await asyncio.sleep(0.2)
-
-    # Final count
-    final_count = sum(1 for _ in output_dir.rglob("SKILL.md"))
+    # New downloads are appended to the manifest as they land
+    with open(manifest_path, "a", encoding="utf-8") as manifest:
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            # Bounded queue drained by a fixed set of workers: a slow skill
+            # never holds up a whole batch
+            queue = asyncio.Queue(maxsize=MAX_CONCURRENT * 4)
+            processed = 0
+
+            async def worker():
+                nonlocal processed
+                while True:
+                    skill = await queue.get()
+                    try:
+                        ok = await try_download(session, skill)
+                    except Exception:
+                        ok = False
+                    finally:
+                        queue.task_done()
+
+                    if ok:
+                        stats["downloaded"] += 1
+                    else:
+                        stats["failed"] += 1
+
+                    processed += 1
+                    if processed % PROGRESS_EVERY == 0 or processed == len(pending):
+                        elapsed = time.time() - start_time
+                        rate = stats["downloaded"] / elapsed if elapsed > 0 else 0
+                        logger.info(
+                            f"Progress {processed}/{len(pending)}: "
+                            f"✅ {stats['downloaded']} | ❌ {stats['failed']} | ⚡ {rate:.1f}/s"
+                        )
+
+            workers = [asyncio.create_task(worker()) for _ in range(MAX_CONCURRENT)]
+            for skill in pending:
+                await queue.put(skill)
+            await queue.join()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    # Final count, without walking the tree again
+    final_count = on_disk + new_dirs
 
     logger.info("=" * 60)
     logger.info("DOWNLOAD COMPLETE")
@@ -306,9 +447,9 @@ async def download_skills(registry_path: Path, output_dir: Path, github_token: s
         "failure_reasons": {k: len(v) for k, v in failures.items()},
         "failures": dict(failures),
     }
-    report_path = output_dir.parent / "failure_report.json"
-    with open(report_path, "w") as f:
-        json.dump(failure_report, f, indent=2)
+    # Compact and gzipped: one run can list tens of thousands of names
+    report_path = output_dir.parent / "failure_report.json.gz"
+    report_path.write_bytes(gzip.compress(dump_json(failure_report)))
     logger.info(f"Failure report saved to {report_path}")
 
     stats["total"] = final_count
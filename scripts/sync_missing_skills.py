@@ -11,7 +11,6 @@ Destination layout:
 """
 
 import argparse
-import json
 import shutil
 from collections import defaultdict
 from pathlib import Path
@@ -24,16 +23,16 @@ from utils import (
     normalize_name,
     get_repo_suffix,
     short_hash,
+    load_json,
+    dump_json,
 )
 
 
 def load_metadata(skill_dir: Path) -> dict:
     meta_path = skill_dir / "metadata.json"
-    if not meta_path.exists():
-        return {}
     try:
-        return json.loads(meta_path.read_text(encoding="utf-8"))
-    except Exception:
+        return load_json(meta_path.read_bytes())
+    except Exception:  # Missing or unreadable metadata
         return {}
 
 
@@ -156,14 +155,14 @@ def main() -> None:
         meta_path = dest_dir / "metadata.json"
         if meta_path.exists():
             try:
-                meta_out = json.loads(meta_path.read_text(encoding="utf-8"))
+                meta_out = load_json(meta_path.read_bytes())
             except Exception:
                 meta_out = {}
             meta_out["dir_name"] = dest_dir.name
             meta_out["category"] = category
             if not meta_out.get("name"):
                 meta_out["name"] = name
-            meta_path.write_text(json.dumps(meta_out, indent=2, ensure_ascii=False), encoding="utf-8")
+            meta_path.write_bytes(dump_json(meta_out, indent=True))
 
         dest_index[key] = dest_dir
         copied += 1
@@ -3,12 +3,77 @@
 Shared utilities for skill registry scripts.
 """
 
+import os
 import re
+import sys
+import time
+import asyncio
 import hashlib
 import json
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
+import yaml
 
+# The flat frontmatter parser is owned by the crawler package at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawler.frontmatter import parse_flat_frontmatter  # noqa: E402  (re-exported)
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json produces identical output
+    orjson = None
+
+# Inline markdown removed from description lines
+_MD_LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+_MD_EMPHASIS_RE = re.compile(r'[*_`]')
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+_HYPHENS_RE = re.compile(r'-+')
+
+
+def dump_json(obj, indent: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes.
+
+    Uses orjson when installed. Output matches json.dumps(..., ensure_ascii=False)
+    with indent=2 (pretty) or compact separators.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def load_json(data: bytes):
+    """Parse JSON from bytes, with orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_frontmatter(block: str):
+    """
+    Parse a frontmatter block with the same result as yaml.safe_load.
+
+    Flat `key: value` blocks (most SKILL.md files) skip PyYAML entirely.
+    Raises yaml.YAMLError like yaml.safe_load.
+    """
+    data = parse_flat_frontmatter(block)
+    if data is not None:
+        return data
+    return yaml.safe_load(block)
+
+
+def strip_inline_markdown(line: str) -> str:
+    """Replace [text](url) links with their text and drop *, _ and ` markers."""
+    return _MD_EMPHASIS_RE.sub('', _MD_LINK_RE.sub(r'\1', line))
+
+
+@lru_cache(maxsize=4096)
 def normalize_name(name: str) -> str:
     """
     Normalize skill/category name: lowercase, hyphens, max 64 chars.
@@ -25,13 +90,14 @@ def normalize_name(name: str) -> str:
     if not name:
         return "unknown"
     # Convert to lowercase, replace non-alphanumeric with hyphens
-    name = re.sub(r'[^a-z0-9]+', '-', name.lower())
+    name = _NON_ALNUM_RE.sub('-', name.lower())
     # Strip leading/trailing hyphens, collapse consecutive hyphens
-    name = re.sub(r'-+', '-', name).strip('-')
+    name = _HYPHENS_RE.sub('-', name).strip('-')
     # Max 64 chars
     return name[:64] if name else "unknown"
 
 
+@lru_cache(maxsize=256)
 def normalize_category(category: str) -> str:
     """
     Normalize category name for directory creation.
@@ -39,8 +105,8 @@ def normalize_category(category: str) -> str:
     """
     if not category:
         return "other"
-    name = re.sub(r'[^a-z0-9]+', '-', category.lower())
-    name = re.sub(r'-+', '-', name).strip('-')
+    name = _NON_ALNUM_RE.sub('-', category.lower())
+    name = _HYPHENS_RE.sub('-', name).strip('-')
     return name[:32] if name else "other"
 
 
@@ -66,6 +132,7 @@ def short_hash(value: str) -> str:
     return _short_hash(value)
 
 
+@lru_cache(maxsize=4096)
 def normalize_repo(repo: str) -> str:
     """Normalize GitHub repo to owner/repo format."""
     repo = (repo or "").strip()
@@ -74,6 +141,7 @@ def normalize_repo(repo: str) -> str:
     return repo.strip("/")
 
 
+@lru_cache(maxsize=4096)
 def get_repo_suffix(repo: str) -> str:
     """Get a short suffix from repo: owner-repo."""
     repo = normalize_repo(repo)
@@ -96,13 +164,8 @@ def build_dir_name(base_name: str, repo: str = "") -> str:
     return f"{base}-{suffix}" if suffix else base
 
 
-def _metadata_key(metadata_path: Path) -> str:
-    if not metadata_path.exists():
-        return ""
-    try:
-        meta = json.loads(metadata_path.read_text(encoding="utf-8"))
-    except Exception:
-        return ""
+def metadata_skill_key(meta: dict) -> str:
+    """The build_skill_key of a metadata.json dict."""
     return build_skill_key(
         meta.get("repo", ""),
         meta.get("path") or meta.get("github_path") or "",
@@ -111,25 +174,15 @@ def _metadata_key(metadata_path: Path) -> str:
     )
 
 
-def ensure_unique_dir(parent: Path, base_name: str, key: str = "", repo: str = "") -> Path:
-    """
-    Ensure directory name is unique on case-insensitive filesystems.
-    If a conflict exists, prefer repo suffix (name-owner-repo).
-    """
-    parent = Path(parent)
-    base = normalize_name(base_name)
-    parent.mkdir(parents=True, exist_ok=True)
+def _metadata_key(metadata_path: Path) -> str:
+    try:
+        meta = load_json(metadata_path.read_bytes())
+    except Exception:  # Missing or unreadable metadata has no key
+        return ""
+    return metadata_skill_key(meta)
 
-    existing = {}
-    matched_by_key = None
-    for d in parent.iterdir():
-        if d.is_dir():
-            existing.setdefault(d.name.lower(), []).append(d)
-            if key and not matched_by_key:
-                meta_key = _metadata_key(d / "metadata.json")
-                if meta_key == key:
-                    matched_by_key = d
 
+def _pick_unique_dir(parent: Path, base: str, existing: dict, matched_by_key: Optional[Path], key: str, repo: str) -> Path:
     # No conflict
     if base.lower() not in existing:
         return parent / base
@@ -153,3 +206,203 @@ def ensure_unique_dir(parent: Path, base_name: str, key: str = "", repo: str = "
         counter += 1
 
     return parent / candidate
+
+
+def ensure_unique_dir(parent: Path, base_name: str, key: str = "", repo: str = "") -> Path:
+    """
+    Ensure directory name is unique on case-insensitive filesystems.
+    If a conflict exists, prefer repo suffix (name-owner-repo).
+    """
+    parent = Path(parent)
+    base = normalize_name(base_name)
+    parent.mkdir(parents=True, exist_ok=True)
+
+    existing = {}
+    matched_by_key = None
+    for d in parent.iterdir():
+        if d.is_dir():
+            existing.setdefault(d.name.lower(), []).append(d)
+            if key and not matched_by_key:
+                meta_key = _metadata_key(d / "metadata.json")
+                if meta_key == key:
+                    matched_by_key = d
+
+    return _pick_unique_dir(parent, base, existing, matched_by_key, key, repo)
+
+
+class SkillDirIndex:
+    """
+    ensure_unique_dir for callers that place many skills in a run.
+
+    Each parent directory is listed, and its metadata.json keys read, once.
+    Callers record what they create with add() (and renames with moved()),
+    so later lookups never re-read the parent.
+    """
+
+    def __init__(self):
+        # parent -> ({lowercase dir name: [dirs]}, {skill key: first dir with it})
+        self._parents = {}
+
+    def _load(self, parent: Path):
+        entry = self._parents.get(parent)
+        if entry is None:
+            existing, keys = {}, {}
+            for d in parent.iterdir():
+                if d.is_dir():
+                    existing.setdefault(d.name.lower(), []).append(d)
+                    meta_key = _metadata_key(d / "metadata.json")
+                    if meta_key:
+                        keys.setdefault(meta_key, d)
+            entry = self._parents[parent] = (existing, keys)
+        return entry
+
+    def ensure_unique_dir(self, parent: Path, base_name: str, key: str = "", repo: str = "") -> Path:
+        """Same choice as ensure_unique_dir, from the cached view of parent."""
+        parent = Path(parent)
+        base = normalize_name(base_name)
+        if parent not in self._parents:
+            parent.mkdir(parents=True, exist_ok=True)
+        existing, keys = self._load(parent)
+        return _pick_unique_dir(parent, base, existing, keys.get(key) if key else None, key, repo)
+
+    def add(self, skill_dir: Path, meta: dict) -> None:
+        """Record a skill directory and the metadata just written to it."""
+        existing, keys = self._load(skill_dir.parent)
+        dirs = existing.setdefault(skill_dir.name.lower(), [])
+        if skill_dir not in dirs:
+            dirs.append(skill_dir)
+        meta_key = metadata_skill_key(meta)
+        if meta_key:
+            keys.setdefault(meta_key, skill_dir)
+
+    def moved(self, old_dir: Path, new_dir: Path) -> None:
+        """Record a rename within the same parent."""
+        existing, keys = self._load(old_dir.parent)
+        dirs = existing.get(old_dir.name.lower(), [])
+        if old_dir in dirs:
+            dirs.remove(old_dir)
+            if not dirs:
+                del existing[old_dir.name.lower()]
+        existing.setdefault(new_dir.name.lower(), []).append(new_dir)
+        for meta_key, d in keys.items():
+            if d == old_dir:
+                keys[meta_key] = new_dir
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """Write bytes with raw os calls; no buffered file object per write."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def write_skill_files(skill_dir: Path, content: str, metadata: dict) -> None:
+    """Write SKILL.md and metadata.json into an existing skill directory."""
+    _write_file(skill_dir / "SKILL.md", content.encode("utf-8"))
+    _write_file(skill_dir / "metadata.json", dump_json(metadata, indent=True))
+
+
+def iter_files_named(root, filename: str, prune=None):
+    """
+    Yield path strings of files called `filename` under root.
+
+    Directories are visited depth-first in listing order, like Path.rglob,
+    without following directory symlinks. Subdirectories for which
+    prune(name) is true are never entered.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        subdirs = []
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if prune is None or not prune(entry.name):
+                            subdirs.append(entry.path)
+                    elif entry.name == filename:
+                        yield entry.path
+        except OSError:
+            continue
+        stack.extend(reversed(subdirs))
+
+
+def list_skill_dirs(skills_dir: Path) -> list:
+    """List (category, skill_dir) pairs for the skills/{category}/{skill-name}/ layout."""
+    skill_dirs = []
+    for category_dir in Path(skills_dir).iterdir():
+        if not category_dir.is_dir() or category_dir.name.startswith('.'):
+            continue
+        category_name = category_dir.name
+        for skill_dir in category_dir.iterdir():
+            if skill_dir.is_dir():
+                skill_dirs.append((category_name, skill_dir))
+    return skill_dirs
+
+
+def find_case_conflicts_in(skill_dirs: list, skills_dir: Path) -> dict:
+    """
+    Group (category, skill_dir) pairs whose names differ only in case.
+
+    Returns {"category/lowercase-name": [relative paths]} for conflicts only.
+    """
+    groups = defaultdict(list)
+    for category_name, skill_dir in skill_dirs:
+        groups[(category_name, skill_dir.name.lower())].append(skill_dir)
+    return {
+        f"{category}/{name}": [str(d.relative_to(skills_dir)) for d in dirs]
+        for (category, name), dirs in groups.items()
+        if len(dirs) > 1
+    }
+
+
+class AsyncRateLimiter:
+    """
+    Pace requests to one host at a steady rate across coroutines.
+
+    Each wait() reserves the next free slot, spaced 1/rate seconds apart,
+    and sleeps until it arrives; pause() pushes every later slot back when
+    the host pushes back. Holds no loop state, so instances can be created
+    at import time.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        wait = self._next_slot - now
+        self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold every waiter for at least `seconds`, e.g. after a 429."""
+        self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+def retry_after(headers) -> Optional[float]:
+    """Seconds a rate-limited response asks us to wait, if it says."""
+    value = headers.get("Retry-After")
+    if value and value.isdigit():
+        return float(value)
+    if headers.get("X-RateLimit-Remaining") == "0":
+        reset = headers.get("X-RateLimit-Reset", "")
+        if reset.isdigit():
+            return max(int(reset) - time.time(), 0.0)
+    return None
+
+
+async def read_head(resp, size: int) -> bytes:
+    """Read up to size bytes of an aiohttp response body, leaving the rest unread."""
+    head = b""
+    while len(head) < size:
+        chunk = await resp.content.read(size - len(head))
+        if not chunk:
+            break
+        head += chunk
+    return head